@@ -11,19 +11,34 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str = ""
     openai_model: str = "gpt-4o"
+    # Sent as prompt_cache_key so OpenAI routes requests sharing the static system prompt to the
+    # same prompt cache (prefix caching itself is automatic). Empty = don't send the parameter.
+    openai_prompt_cache_key: str = ""
 
     # ChromaDB
     chroma_persist_directory: str = "/data/chroma"
     chroma_collection_name: str = "planning_documents"
+    # Chunks per collection.add call (clamped to the Chroma client's max batch size)
+    chroma_add_batch_size: int = 100
 
     # PDF Data
     pdf_data_directory: str = "/data/pdfs"
+    # Worker threads that hash/extract/chunk PDFs in parallel during sync (1 = serial)
+    sync_max_workers: int = 4
+    # Buffer new chunks across documents and add them once this many are pending
+    sync_flush_chunks: int = 2048
 
     # Retrieval
     retrieval_top_k: int = 5
     # Optional: drop chunks with distance > this (Chroma L2; lower = better). None = no filter.
     retrieval_max_distance: float | None = None
 
+    # Streaming
+    # Send X-Accel-Buffering: no so nginx-style proxies flush each NDJSON line immediately
+    disable_proxy_buffering: bool = True
+    # Coalesce this many LLM tokens into one NDJSON chunk line (1 = one line per token)
+    stream_flush_every_n: int = 4
+
     # Chunking
     chunk_size: int = 1000
     chunk_overlap: int = 200
@@ -2,6 +2,8 @@
 import hashlib
 import json
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
@@ -28,6 +30,9 @@ class DocumentRecord:
     last_ingested_at: str
     page_count: int = 0
     chunk_count: int = 0
+    # File stat at the last hash: while (mtime_ns, size) still match, the file is not re-hashed
+    file_mtime_ns: int | None = None
+    file_size: int | None = None
     
     def to_dict(self) -> dict:
         return asdict(self)
@@ -45,12 +50,14 @@ class DocumentRegistry:
     - Content hashing (SHA256) for change detection
     - Incremental sync (NEW, UNCHANGED, UPDATED, DELETED)
     - Chunk ID tracking for selective deletion
-    - Persistent registry file
+    - Persistent registry file (written once per batch() instead of per change)
     """
     
     def __init__(self, registry_path: Path):
         self.registry_path = registry_path
         self.records: dict[str, DocumentRecord] = {}
+        self._batch_depth = 0
+        self._dirty = False
         self._load()
     
     def _load(self) -> None:
@@ -70,8 +77,27 @@ class DocumentRegistry:
         else:
             logger.info("No existing registry, starting fresh")
     
+    @contextmanager
+    def batch(self) -> Iterator["DocumentRegistry"]:
+        """
+        Group registry changes into one write: inside the block, register/unregister/clear
+        update records in memory and the file is rewritten once on exit (also on error, so
+        changes already applied to the vector store are not lost). Nested batches are allowed.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self._save()
+    
     def _save(self) -> None:
-        """Persist registry to disk."""
+        """Persist registry to disk (deferred to the end of the outermost batch())."""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.registry_path, "w") as f:
             json.dump(
@@ -84,11 +110,27 @@ class DocumentRegistry:
     @staticmethod
     def compute_hash(file_path: Path) -> str:
         """Compute SHA256 hash of file contents."""
-        sha256 = hashlib.sha256()
+        # file_digest reads into one reusable buffer and hashes without the GIL (Python 3.11+)
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    
+    def matches_file_stat(self, source_id: str, mtime_ns: int, size: int) -> bool:
+        """True if the registered document was hashed at this exact (mtime_ns, size)."""
+        existing = self.records.get(source_id)
+        return (
+            existing is not None
+            and existing.file_mtime_ns == mtime_ns
+            and existing.file_size == size
+        )
+    
+    def update_file_stat(self, source_id: str, mtime_ns: int, size: int) -> None:
+        """Record the file stat of an unchanged (re-hashed, same content) document."""
+        existing = self.records.get(source_id)
+        if existing is None:
+            return
+        existing.file_mtime_ns = mtime_ns
+        existing.file_size = size
+        self._save()
     
     def get_status(self, source_id: str, content_hash: str) -> DocumentStatus:
         """Determine document status based on registry."""
@@ -101,17 +143,19 @@ class DocumentRegistry:
         else:
             return DocumentStatus.UPDATED
     
-    def get_deleted_sources(self, current_sources: set[str]) -> list[str]:
+    def get_deleted_sources(self, current_sources: frozenset[str] | set[str]) -> list[str]:
         """Find sources in registry but not in current file list."""
-        registered = set(self.records.keys())
-        return list(registered - current_sources)
+        # The keys view is already a set: one hashed difference, no copy of the registry keys
+        return list(self.records.keys() - current_sources)
     
     def register(
         self,
         source_id: str,
         content_hash: str,
         chunk_ids: list[str],
-        page_count: int = 0
+        page_count: int = 0,
+        file_mtime_ns: int | None = None,
+        file_size: int | None = None
     ) -> None:
         """Register or update a document in the registry."""
         existing = self.records.get(source_id)
@@ -124,7 +168,9 @@ class DocumentRegistry:
             version=version,
             last_ingested_at=datetime.now(timezone.utc).isoformat(),
             page_count=page_count,
-            chunk_count=len(chunk_ids)
+            chunk_count=len(chunk_ids),
+            file_mtime_ns=file_mtime_ns,
+            file_size=file_size
         )
         self._save()
         logger.info(f"Registered document: {source_id} (v{version}, {len(chunk_ids)} chunks)")
@@ -6,6 +6,9 @@ refusal, we return a deterministic checklist without retrieval/LLM.
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+
+from .guards.geometry_guard import missing_geometry_layers, has_geometry
 
 # English phrases (normalized: lowercase, optional punctuation)
 _NEEDS_INPUT_PHRASES_EN = (
@@ -20,9 +23,10 @@ _NEEDS_INPUT_PHRASES_EN = (
     r"what'?s\s+missing\s+to\s+answer",
 )
 
-_NEEDS_INPUT_PATTERNS = [
-    re.compile(p, re.IGNORECASE) for p in _NEEDS_INPUT_PHRASES_EN
-]
+# All phrases in one compiled alternation: a single scan instead of one search per phrase
+_NEEDS_INPUT_RE = re.compile(
+    "|".join(f"(?:{p})" for p in _NEEDS_INPUT_PHRASES_EN), re.IGNORECASE
+)
 
 
 def is_needs_input_followup(question: str) -> bool:
@@ -34,10 +38,16 @@ def is_needs_input_followup(question: str) -> bool:
     """
     if not question or not isinstance(question, str):
         return False
-    text = (question or "").strip()
+    text = question.strip().lower()
     if not text:
         return False
-    return any(pat.search(text) for pat in _NEEDS_INPUT_PATTERNS)
+    return _is_needs_input_normalized(text)
+
+
+@lru_cache(maxsize=4096)
+def _is_needs_input_normalized(text: str) -> bool:
+    """Cached core of is_needs_input_followup; expects stripped, lowercased text."""
+    return _NEEDS_INPUT_RE.search(text) is not None
 
 
 def _layer_name(obj: dict) -> str | None:
@@ -55,8 +65,6 @@ def get_missing_geometry_layers(session_objects: list[dict]) -> list[str]:
     Prefer: Highway and Plot Boundary if they exist and lack geometry.
     If all geometries are null, include all layers present (or at least Highway + Plot Boundary if present).
     """
-    from .guards.geometry_guard import missing_geometry_layers, has_geometry
-
     if not session_objects:
         return []
 
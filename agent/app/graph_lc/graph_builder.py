@@ -110,7 +110,7 @@ def run_graph_until_route(
     Run graph nodes validate -> smalltalk -> geometry_guard -> followup -> summarize -> route -> retrieve.
     Returns state dict. Used by /answer/stream so streaming uses the same node logic (single source of truth).
     """
-    state: dict[str, Any] = {
+    state: GraphState = {
         "question": request.question,
         "session_objects": request.session_objects,
         "_reasoning_service": reasoning_service,
@@ -1,7 +1,6 @@
 """LangGraph node functions for hybrid RAG (LangChain-native)."""
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
@@ -9,6 +8,9 @@ from .. import smalltalk
 from .. import followups
 from .. import routing
 from ..guards import geometry_guard
+from ..guards.doc_only_guard import should_use_retrieved_for_doc_only
+from ..models import SessionSummary
+from ..rag.prompts import render_session_summary
 from .state import GraphState
 
 logger = logging.getLogger(__name__)
@@ -65,16 +67,19 @@ def followup_node(state: GraphState) -> dict[str, Any]:
 
 
 def summarize_node(state: GraphState) -> dict[str, Any]:
-    """Compute session_summary using ReasoningService."""
+    """Compute session_summary using ReasoningService, plus its rendered hybrid-prompt fields."""
     reasoning_service = state.get("_reasoning_service")
     session_objects = state.get("session_objects", [])
 
     if not reasoning_service:
-        return {"session_summary": None}
+        return {"session_summary": None, "session_summary_rendered": None}
 
-    session_summary = reasoning_service.compute_session_summary(session_objects)
-    logger.info("Session summary: %s", session_summary.layer_counts)
-    return {"session_summary": session_summary}
+    session_summary = reasoning_service.compute_session_summary_dict(session_objects)
+    logger.info("Session summary: %s", session_summary["layer_counts"])
+    return {
+        "session_summary": session_summary,
+        "session_summary_rendered": render_session_summary(session_summary),
+    }
 
 
 def route_node(state: GraphState) -> dict[str, Any]:
@@ -116,16 +121,13 @@ def retrieve_node(state: GraphState) -> dict[str, Any]:
 def llm_node(state: GraphState) -> dict[str, Any]:
     """Invoke LCEL chain (doc_only or hybrid)."""
     from ..rag.chains import DOC_ONLY_EMPTY_MESSAGE, invoke_doc_only, invoke_hybrid
-    from ..guards.doc_only_guard import should_use_retrieved_for_doc_only
 
     question = state.get("question", "")
     session_objects = state.get("session_objects", [])
-    session_summary = state.get("session_summary")
+    session_summary = state.get("session_summary") or {}
     retrieved_docs = state.get("retrieved_docs", [])
     doc_only = state.get("doc_only", False)
 
-    session_summary_dict = session_summary.model_dump() if session_summary else {}
-
     if doc_only:
         if not retrieved_docs or not should_use_retrieved_for_doc_only(question, retrieved_docs):
             answer = DOC_ONLY_EMPTY_MESSAGE
@@ -135,29 +137,36 @@ def llm_node(state: GraphState) -> dict[str, Any]:
         answer = invoke_hybrid(
             question=question,
             json_objects=session_objects,
-            session_summary=session_summary_dict,
+            session_summary=session_summary,
             retrieved_chunks=retrieved_docs,
+            rendered=state.get("session_summary_rendered"),
         )
     return {"answer_text": answer}
 
 
 def finalize_node(state: GraphState) -> dict[str, Any]:
-    """For guard paths: set answer_text and session_summary. For main path: pass through."""
+    """
+    For guard paths: set answer_text and session_summary (empty for small talk). For main path:
+    pass through.
+    """
     guard_result = state.get("guard_result")
     reasoning_service = state.get("_reasoning_service")
     session_objects = state.get("session_objects", [])
 
     if guard_result:
         gr_type = guard_result.get("type")
+        if gr_type == "smalltalk":
+            # Small talk never looks at the drawing: answer with an empty summary, don't compute one.
+            return {
+                "answer_text": smalltalk.get_smalltalk_response(state.get("question", "")),
+                "session_summary": SessionSummary().model_dump(),
+            }
         session_summary = state.get("session_summary")
         if session_summary is None and reasoning_service:
-            session_summary = reasoning_service.compute_session_summary(session_objects)
+            session_summary = reasoning_service.compute_session_summary_dict(session_objects)
         updates: dict[str, Any] = {}
         if session_summary is not None:
             updates["session_summary"] = session_summary
-        if gr_type == "smalltalk":
-            updates["answer_text"] = smalltalk.get_smalltalk_response(state.get("question", ""))
-            return updates
         if gr_type == "missing_geometry":
             missing = guard_result.get("missing_layers", [])
             updates["answer_text"] = (
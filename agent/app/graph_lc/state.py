@@ -3,8 +3,6 @@ from __future__ import annotations
 
 from typing import Any, Literal, TypedDict
 
-from ..models import SessionSummary
-
 QueryMode = Literal["doc_only", "json_only", "hybrid"]
 
 
@@ -13,7 +11,10 @@ class GraphState(TypedDict, total=False):
 
     question: str
     session_objects: list[dict[str, Any]]
-    session_summary: SessionSummary | None
+    # Plain dict (SessionSummary fields); wrapped into SessionSummary only at the API boundary
+    session_summary: dict[str, Any] | None
+    # Hybrid prompt fields rendered from session_summary (see rag.prompts.render_session_summary)
+    session_summary_rendered: dict[str, str] | None
     doc_only: bool
     query_mode: QueryMode
     retrieved_docs: list[dict]
@@ -13,6 +13,18 @@ def _normalize(t: str) -> str:
 # Quote characters that may wrap the term (straight and smart/curly)
 _QUOTE_CHARS = "'\"\u2018\u2019\u201c\u201d"
 
+# Definition-question patterns used by extract_definition_term, compiled once (in the order tried)
+_MEANT_BY_QUOTED_RE = re.compile(
+    r"what\s+is\s+meant\s+by\s+[\"'\u201c\u2018]([^\"'\u201d\u2019?]+)[\"'\u201d\u2019]?\s*\??\s*$", re.I
+)
+_MEANT_BY_RE = re.compile(r"what\s+is\s+meant\s+by\s+([^?,]+?)(?:\s*[?,]|\s*$)", re.I)
+_DEFINITION_OF_ARTICLE_RE = re.compile(
+    r"what\s+is\s+the\s+(?:definition|meaning)\s+of\s+(?:a|an|the)\s+([^?]+?)\s*\??\s*$", re.I
+)
+_DEFINITION_OF_RE = re.compile(r"what\s+is\s+the\s+(?:definition|meaning)\s+of\s+([^?]+?)\s*\??\s*$", re.I)
+_WHAT_IS_ARTICLE_RE = re.compile(r"what\s+is\s+(?:a|an|the)\s+([^?]+?)\s*\??\s*$", re.I)
+_TERM_END_RE = re.compile(r"\s*[?,]\s*")
+
 
 def _normalize_term_for_match(term: str) -> str:
     """Strip quotes and normalize so term matches chunk text (e.g. principal elevation matches principal-elevation)."""
@@ -40,41 +52,33 @@ def extract_definition_term(question: str) -> str | None:
     normalized = _normalize(q)
 
     # "what is meant by 'X'" or "what is meant by \"X\"" (straight and smart/curly quotes)
-    m = re.search(r"what\s+is\s+meant\s+by\s+[\"'\u201c\u2018]([^\"'\u201d\u2019?]+)[\"'\u201d\u2019]?\s*\??\s*$", normalized, re.I)
+    m = _MEANT_BY_QUOTED_RE.search(normalized)
     if m:
         term = m.group(1).strip()
         if term and len(term) < 80:
             return _normalize_term_for_match(term)
 
     # "what is meant by X" (no quotes) — take next phrase up to ? or ,
-    m = re.search(r"what\s+is\s+meant\s+by\s+([^?,]+?)(?:\s*[?,]|\s*$)", normalized, re.I)
+    m = _MEANT_BY_RE.search(normalized)
     if m and m.group(1):
         term = m.group(1).strip()
         if term and len(term) < 80:
             return _normalize_term_for_match(term)
 
     # "what is the definition of a highway?" / "what is the definition of X?" → extract X (e.g. "highway")
-    m = re.search(
-        r"what\s+is\s+the\s+(?:definition|meaning)\s+of\s+(?:a|an|the)\s+([^?]+?)\s*\??\s*$",
-        normalized,
-        re.I,
-    )
+    m = _DEFINITION_OF_ARTICLE_RE.search(normalized)
     if m and m.group(1):
         term = m.group(1).strip()
         if term and len(term) < 80:
             return _normalize_term_for_match(term)
-    m = re.search(
-        r"what\s+is\s+the\s+(?:definition|meaning)\s+of\s+([^?]+?)\s*\??\s*$",
-        normalized,
-        re.I,
-    )
+    m = _DEFINITION_OF_RE.search(normalized)
     if m and m.group(1):
         term = m.group(1).strip()
         if term and len(term) < 80:
             return _normalize_term_for_match(term)
 
     # "what is a X?", "what is the X?" (generic — avoid capturing "definition of a X")
-    m = re.search(r"what\s+is\s+(?:a|an|the)\s+([^?]+?)\s*\??\s*$", normalized, re.I)
+    m = _WHAT_IS_ARTICLE_RE.search(normalized)
     if m and m.group(1):
         term = m.group(1).strip()
         if term and len(term) < 80:
@@ -86,7 +90,7 @@ def extract_definition_term(question: str) -> str | None:
             rest = normalized[len(prefix) :].strip()
             if not rest:
                 continue
-            term = re.split(r"\s*[?,]\s*", rest)[0].strip()
+            term = _TERM_END_RE.split(rest, maxsplit=1)[0].strip()
             if term and len(term) < 80:
                 return _normalize_term_for_match(term)
 
@@ -102,13 +106,11 @@ def term_appears_in_chunks(term: str, chunks: list[dict]) -> bool:
     needle = _normalize_term_for_match(term)
     if not needle:
         return False
-    for c in chunks:
-        text = c.get("text") or c.get("page_content") or ""
-        # Normalize chunk text the same way (hyphen as space) so "principal-elevation" matches "principal elevation"
-        chunk_norm = _normalize(text).replace("-", " ")
-        if needle in chunk_norm:
-            return True
-    return False
+    # One search over all chunk texts, normalized the same way (hyphen as space) so
+    # "principal-elevation" matches "principal elevation". NUL-separated so a match never spans
+    # two chunks.
+    haystack = "\x00".join((c.get("text") or c.get("page_content") or "").strip() for c in chunks)
+    return needle in _normalize(haystack).replace("-", " ")
 
 
 def should_use_retrieved_for_doc_only(question: str, retrieved_chunks: list[dict]) -> bool:
@@ -8,6 +8,9 @@ general rules (e.g. "what is meant by...", "according to the regulations").
 """
 from __future__ import annotations
 
+import re
+from functools import lru_cache
+
 # Phrases that indicate a GENERAL RULE / explanatory question → do NOT trigger guard (DOC_ONLY style)
 # Note: "would " removed as too broad; "would this property..." should trigger guard
 _GENERAL_RULE_PHRASES = (
@@ -52,6 +55,12 @@ _SPATIAL_KEYWORDS = frozenset({
     "elevation",  # when used with fronts/highway
 })
 
+# Each phrase group as one compiled alternation: a single C-level scan of the question replaces
+# a Python loop of `in` checks (any match anywhere is all the predicates need).
+_GENERAL_RULE_RE = re.compile("|".join(map(re.escape, _GENERAL_RULE_PHRASES)))
+_THIS_DRAWING_RE = re.compile("|".join(map(re.escape, _THIS_DRAWING_PHRASES)))
+_SPATIAL_RE = re.compile("|".join(map(re.escape, _SPATIAL_KEYWORDS)))
+
 # Canonical layer names used in required_layers_for_question and missing_geometry_layers
 _LAYER_HIGHWAY = "Highway"
 _LAYER_PLOT_BOUNDARY = "Plot Boundary"
@@ -70,6 +79,17 @@ _EXTRA_LAYER_KEYWORDS = {
     "doors": {_LAYER_DOORS},
 }
 
+# Question keywords (substring match) that require Highway + Plot Boundary: fronting plus other
+# spatial terms that imply the property/highway relationship. Compiled once into one alternation.
+_FRONTING_TRIGGER_RE = re.compile("|".join(map(re.escape, (
+    "front", "highway", "boundary", "plot", "adjacent", "distance", "intersect", "touch",
+    "overlap", "align", "position", "orientation", "coordinates", "geometry",
+))))
+# Longest keyword first so "walls"/"doors" win over "wall"/"door" at the same position.
+_EXTRA_LAYER_RE = re.compile("|".join(
+    re.escape(kw) for kw in sorted(_EXTRA_LAYER_KEYWORDS, key=len, reverse=True)
+))
+
 
 def _normalize(text: str) -> str:
     return (text or "").strip().lower()
@@ -87,14 +107,20 @@ def should_trigger_geometry_guard(question: str) -> bool:
     normalized = _normalize(question)
     if not normalized:
         return False
+    return _should_trigger_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _should_trigger_normalized(normalized: str) -> bool:
+    """Cached core of should_trigger_geometry_guard; expects non-empty normalized text."""
     # General rule / explanatory → do not trigger
-    if any(phrase in normalized for phrase in _GENERAL_RULE_PHRASES):
+    if _GENERAL_RULE_RE.search(normalized):
         return False
     # Must be about this specific drawing
-    if not any(phrase in normalized for phrase in _THIS_DRAWING_PHRASES):
+    if not _THIS_DRAWING_RE.search(normalized):
         return False
     # Must be spatial (fronting, distance, etc.)
-    return any(kw in normalized for kw in _SPATIAL_KEYWORDS)
+    return _SPATIAL_RE.search(normalized) is not None
 
 
 def is_spatial_question(question: str) -> bool:
@@ -108,7 +134,13 @@ def is_spatial_question(question: str) -> bool:
     normalized = _normalize(question)
     if not normalized:
         return False
-    return any(kw in normalized for kw in _SPATIAL_KEYWORDS)
+    return _is_spatial_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _is_spatial_normalized(normalized: str) -> bool:
+    """Cached core of is_spatial_question; expects non-empty normalized text."""
+    return _SPATIAL_RE.search(normalized) is not None
 
 
 def required_layers_for_question(question: str) -> set[str]:
@@ -117,20 +149,19 @@ def required_layers_for_question(question: str) -> set[str]:
     For front/fronting questions: at minimum Highway and Plot Boundary.
     If question mentions elevation, wall(s), door(s), also require those layers.
     """
-    normalized = _normalize(question)
-    required = set()
-    # Fronting-style questions always need Highway and Plot Boundary
-    if any(p in normalized for p in ("front", "fronts", "fronting")):
-        required.update(_FRONTING_REQUIRED_LAYERS)
-    # Other spatial keywords that imply highway/boundary (e.g. "does the property front")
-    if any(k in normalized for k in ("highway", "boundary", "plot", "adjacent", "distance",
-                                      "intersect", "touch", "overlap", "align", "position",
-                                      "orientation", "coordinates", "geometry")):
+    return set(_required_layers_normalized(_normalize(question)))
+
+
+@lru_cache(maxsize=4096)
+def _required_layers_normalized(normalized: str) -> frozenset[str]:
+    """Cached core of required_layers_for_question: one regex scan per keyword group."""
+    required: set[str] = set()
+    # Fronting-style questions and other spatial keywords that imply highway/boundary
+    if _FRONTING_TRIGGER_RE.search(normalized):
         required.update(_FRONTING_REQUIRED_LAYERS)
-    for kw, layers in _EXTRA_LAYER_KEYWORDS.items():
-        if kw in normalized:
-            required.update(layers)
-    return required
+    for kw in _EXTRA_LAYER_RE.findall(normalized):
+        required.update(_EXTRA_LAYER_KEYWORDS[kw])
+    return frozenset(required)
 
 
 def has_geometry(obj: dict) -> bool:
@@ -193,24 +224,20 @@ def missing_geometry_layers(
         return []
     if not session_objects:
         return []
-    # Group objects by matching required layer (use first matching canonical name per obj)
-    from collections import defaultdict
-    layer_to_objs: dict[str, list[dict]] = defaultdict(list)
-    canonical_for_match: dict[str, str] = {}  # normalized key -> canonical name from required
-    for r in required_layers:
-        canonical_for_match[r.lower()] = r
+    # One pass: each object goes to its first matching canonical layer (same rule as
+    # _layer_matches, required names lowercased once) and only ORs into that layer's
+    # "some object has geometry" flag; no per-layer object lists are built. Dict order is
+    # first-seen layer order, as before.
+    layer_has_geometry: dict[str, bool] = {}
+    required_lower = [(r, r.lower()) for r in required_layers]
     for obj in session_objects:
         layer = _layer_name(obj)
         if not layer:
             continue
-        for req in required_layers:
-            if _layer_matches(layer, {req}):
-                layer_to_objs[req].append(obj)
+        layer_lower = layer.lower()
+        for req, req_lower in required_lower:
+            if req_lower == layer_lower or req_lower in layer_lower or layer_lower in req_lower:
+                if not layer_has_geometry.get(req):
+                    layer_has_geometry[req] = has_geometry(obj)
                 break
-    missing = []
-    for layer_name, objs in layer_to_objs.items():
-        if not objs:
-            continue
-        if all(not has_geometry(o) for o in objs):
-            missing.append(layer_name)
-    return missing
+    return [layer_name for layer_name, found in layer_has_geometry.items() if not found]
@@ -1,5 +1,6 @@
 """PDF ingestion and chunking service."""
 import logging
+import os
 from pathlib import Path
 from typing import Generator
 
@@ -33,7 +34,12 @@ class PDFIngestionService:
             logger.warning("PDF directory does not exist: %s", self.pdf_directory)
             return []
 
-        pdf_files = list(self.pdf_directory.glob("*.pdf"))
+        # One scandir pass: name and file type come from the directory entry, no pattern matching
+        with os.scandir(self.pdf_directory) as entries:
+            pdf_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".pdf") and entry.is_file()
+            ]
         logger.info("Found %s PDF files", len(pdf_files))
         return pdf_files
 
@@ -102,13 +108,14 @@ class PDFIngestionService:
         if not pdf_files:
             logger.warning("No PDF files found to ingest")
             return 0, 0
-        all_chunks = []
+        total_chunks = 0
         for pdf_path in pdf_files:
             pages = self.extract_text_from_pdf(pdf_path)
-            chunks = list(self.chunk_pages(pages))
-            all_chunks.extend(chunks)
-            logger.info("Created %s chunks from %s", len(chunks), pdf_path.name)
-        return len(pdf_files), len(all_chunks)
+            # Only counted: consume the generator without keeping the chunks
+            chunk_count = sum(1 for _ in self.chunk_pages(pages))
+            total_chunks += chunk_count
+            logger.info("Created %s chunks from %s", chunk_count, pdf_path.name)
+        return len(pdf_files), total_chunks
 
     def get_chunks_for_storage(self) -> list[dict]:
         """Get all chunks ready for vector store."""
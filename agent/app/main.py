@@ -1,4 +1,5 @@
 """Agent service - FastAPI application. LangChain + LangGraph primary framework."""
+import asyncio
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -8,8 +9,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 
 from .config import get_settings
-from .models import (
-    AnswerRequest, AnswerResponse,
+from .models import AnswerRequest, AnswerResponse
+from .models_admin import (
     IngestRequest, IngestResponse, HealthResponse, SyncStatusResponse, DocumentInfo
 )
 from .ingest.ingestion import PDFIngestionService
@@ -18,7 +19,7 @@ from .reasoning import ReasoningService
 from .document_registry import DocumentRegistry
 from .sync_service import DocumentSyncService
 from .graph_lc import build_answer_graph
-from .rag import build_chains, run_answer, stream_answer_ndjson
+from .rag import build_chains, clear_retrieval_cache, run_answer, stream_answer_ndjson
 
 # Configure logging
 logging.basicConfig(
@@ -65,6 +66,7 @@ async def lifespan(app: FastAPI):
         api_key=settings.openai_api_key,
         temperature=0.1,
         max_tokens=2000,
+        prompt_cache_key=settings.openai_prompt_cache_key,
     )
     answer_graph = build_answer_graph(
         reasoning_service=reasoning_service,
@@ -72,10 +74,34 @@ async def lifespan(app: FastAPI):
     )
     logger.info("LangChain LCEL chains and LangGraph workflow initialized")
 
-    # Incremental sync on startup (idempotent)
-    logger.info("Running incremental document sync...")
-    result = sync_service.sync(delete_missing=False)
+    # Incremental sync on startup (idempotent), run in the background so requests are
+    # served while documents are ingested.
+    logger.info("Running incremental document sync in background...")
+    app.state.sync_ready = False
+    app.state.sync_task = asyncio.create_task(
+        asyncio.to_thread(sync_service.sync, delete_missing=False)
+    )
+    app.state.sync_task.add_done_callback(lambda task: _on_startup_sync_done(app, task))
+
+    logger.info("Agent service started successfully")
+
+    yield
+
+    logger.info("Shutting down Agent service...")
 
+
+def _on_startup_sync_done(app: FastAPI, task: asyncio.Task) -> None:
+    """Log the startup sync result and mark the document index as ready."""
+    app.state.sync_ready = True
+    clear_retrieval_cache()
+    if task.cancelled():
+        logger.warning("Startup document sync cancelled")
+        return
+    if task.exception() is not None:
+        logger.error(f"Startup document sync failed: {task.exception()}")
+        return
+
+    result = task.result()
     if result.has_changes:
         logger.info(
             f"Sync result: {result.new_documents} new, "
@@ -89,11 +115,10 @@ async def lifespan(app: FastAPI):
         for error in result.errors:
             logger.error(f"Sync error: {error}")
 
-    logger.info("Agent service started successfully")
-
-    yield
 
-    logger.info("Shutting down Agent service...")
+def _startup_sync_running() -> bool:
+    """True while the background startup sync has not finished."""
+    return not getattr(app.state, "sync_ready", True)
 
 
 # Create FastAPI app
@@ -126,7 +151,8 @@ async def health_check():
         status="healthy",
         vector_store_ready=vector_store.is_ready() if vector_store else False,
         documents_count=vector_store.count() if vector_store else 0,
-        registered_documents=len(document_registry.get_all_records()) if document_registry else 0
+        registered_documents=len(document_registry.get_all_records()) if document_registry else 0,
+        sync_ready=not _startup_sync_running(),
     )
 
 
@@ -160,14 +186,18 @@ async def ingest_documents(request: IngestRequest):
     """Ingest PDF documents into the vector store (incremental sync)."""
     if not sync_service:
         raise HTTPException(status_code=503, detail="Services not initialized")
+    if _startup_sync_running():
+        raise HTTPException(status_code=503, detail="Startup document sync in progress")
 
     try:
+        # Sync is blocking (PDF parsing, embedding, Chroma writes): run it off the event loop
         if request.force_reingest:
             logger.info("Force reingest requested...")
-            result = sync_service.force_reingest(source_id=request.source_id)
+            result = await asyncio.to_thread(sync_service.force_reingest, source_id=request.source_id)
         else:
             logger.info("Running incremental sync...")
-            result = sync_service.sync(delete_missing=request.delete_missing)
+            result = await asyncio.to_thread(sync_service.sync, delete_missing=request.delete_missing)
+        clear_retrieval_cache()
 
         total_docs = result.new_documents + result.updated_documents
 
@@ -184,6 +214,7 @@ async def ingest_documents(request: IngestRequest):
         )
 
     except Exception as e:
+        clear_retrieval_cache()  # a failed sync may still have changed some documents
         logger.error(f"Ingestion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -198,7 +229,8 @@ async def answer_question(request: AnswerRequest):
     if not answer_graph:
         raise HTTPException(status_code=503, detail="Answer workflow not initialized")
     try:
-        return run_answer(request, answer_graph)
+        # The graph runs synchronously (Chroma + LLM calls): keep it off the event loop.
+        return await asyncio.to_thread(run_answer, request, answer_graph)
     except HTTPException:
         raise
     except Exception as e:
@@ -210,17 +242,20 @@ async def answer_question(request: AnswerRequest):
 async def answer_question_stream(request: AnswerRequest):
     """
     Answer a question with streaming response.
-    Returns NDJSON: {"t":"chunk","c":"..."} then {"t":"done", ...}.
+    Returns NDJSON: {"t":"chunk","c":"..."} then {"t":"done", ...} (deterministic answers: done only).
     """
     if not vector_store or not reasoning_service:
         raise HTTPException(status_code=503, detail="Services not initialized")
     if not _llm_available():
         raise HTTPException(status_code=503, detail="LLM service not configured (missing API key)")
     settings = get_settings()
+    headers = {"Cache-Control": "no-cache"}
+    if settings.disable_proxy_buffering:
+        headers["X-Accel-Buffering"] = "no"
     return StreamingResponse(
         stream_answer_ndjson(request, reasoning_service, settings),
         media_type="application/x-ndjson",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers=headers,
     )
 
 
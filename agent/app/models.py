@@ -1,16 +1,21 @@
 """Pydantic models for Agent service."""
-from pydantic import BaseModel, Field
-from typing import Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Literal
 
 
-class DrawingObject(BaseModel):
+class _AgentModel(BaseModel):
+    """Base for agent models: ignore unknown fields and build schemas on first use, not at import."""
+    model_config = ConfigDict(extra="ignore", defer_build=True)
+
+
+class DrawingObject(_AgentModel):
     """A single drawing object from the session JSON."""
     layer: str = Field(..., description="Layer name (e.g., Highway, Walls, Doors)")
     type: str = Field(default="unknown", description="Object type")
     properties: dict[str, Any] = Field(default_factory=dict, description="Object properties")
 
 
-class SessionSummary(BaseModel):
+class SessionSummary(_AgentModel):
     """Computed summary of session objects for reasoning."""
     layer_counts: dict[str, int] = Field(default_factory=dict)
     plot_boundary_present: bool = False
@@ -23,8 +28,10 @@ class SessionSummary(BaseModel):
     )
 
 
-class AnswerRequest(BaseModel):
+class AnswerRequest(_AgentModel):
     """Request model for /answer endpoint."""
+    model_config = ConfigDict(frozen=True)
+
     question: str = Field(..., description="User question")
     session_objects: list[dict[str, Any]] = Field(
         default_factory=list,
@@ -32,8 +39,10 @@ class AnswerRequest(BaseModel):
     )
 
 
-class ChunkEvidence(BaseModel):
+class ChunkEvidence(_AgentModel):
     """Evidence from a retrieved document chunk."""
+    model_config = ConfigDict(frozen=True)
+
     chunk_id: str
     source: str
     page: str | None = None
@@ -41,70 +50,27 @@ class ChunkEvidence(BaseModel):
     text_snippet: str
 
 
-class ObjectEvidence(BaseModel):
+class ObjectEvidence(_AgentModel):
     """Evidence from session objects."""
+    model_config = ConfigDict(frozen=True)
+
     layers_used: list[str]
     object_indices: list[int]
 
 
-class Evidence(BaseModel):
+class Evidence(_AgentModel):
     """Combined evidence for answer."""
+    model_config = ConfigDict(frozen=True)
+
     document_chunks: list[ChunkEvidence] = Field(default_factory=list)
     session_objects: ObjectEvidence | None = None
 
 
-class AnswerResponse(BaseModel):
-    """Response model for /answer endpoint."""
+class AnswerResponse(_AgentModel):
+    """Response model for /answer endpoint. Built from trusted graph state via model_construct."""
+    model_config = ConfigDict(frozen=True)
+
     answer: str
-    evidence: Evidence
+    evidence: Evidence = Field(default_factory=Evidence)
+    query_mode: Literal["doc_only", "json_only", "hybrid"] | None = None
     session_summary: SessionSummary | None = None
-
-
-class IngestRequest(BaseModel):
-    """Request model for /ingest endpoint."""
-    force_reingest: bool = Field(
-        default=False,
-        description="Force re-ingestion (clears registry and re-processes all)"
-    )
-    delete_missing: bool = Field(
-        default=False,
-        description="Delete chunks for documents no longer in source directory"
-    )
-    source_id: str | None = Field(
-        default=None,
-        description="Specific document to re-ingest (with force_reingest)"
-    )
-
-
-class IngestResponse(BaseModel):
-    """Response model for /ingest endpoint."""
-    success: bool
-    documents_processed: int
-    chunks_created: int
-    message: str
-
-
-class DocumentInfo(BaseModel):
-    """Information about a registered document."""
-    source_id: str
-    version: int
-    chunk_count: int
-    page_count: int
-    last_ingested_at: str
-    content_hash: str
-
-
-class SyncStatusResponse(BaseModel):
-    """Response model for /sync/status endpoint."""
-    registered_documents: int
-    total_chunks: int
-    vector_store_count: int
-    documents: list[DocumentInfo]
-
-
-class HealthResponse(BaseModel):
-    """Response model for /health endpoint."""
-    status: str
-    vector_store_ready: bool
-    documents_count: int
-    registered_documents: int = 0
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Pydantic models for the agent's admin endpoints (/health, /ingest, /sync/status).
+
+Kept apart from models.py so the answer path (graph, orchestrator, reasoning) only
+imports the models it uses.
+"""
+from pydantic import ConfigDict, Field
+
+from .models import _AgentModel
+
+
+class IngestRequest(_AgentModel):
+    """Request model for /ingest endpoint."""
+    model_config = ConfigDict(frozen=True)
+
+    force_reingest: bool = Field(
+        default=False,
+        description="Force re-ingestion (clears registry and re-processes all)"
+    )
+    delete_missing: bool = Field(
+        default=False,
+        description="Delete chunks for documents no longer in source directory"
+    )
+    source_id: str | None = Field(
+        default=None,
+        description="Specific document to re-ingest (with force_reingest)"
+    )
+
+
+class IngestResponse(_AgentModel):
+    """Response model for /ingest endpoint."""
+    success: bool
+    documents_processed: int
+    chunks_created: int
+    message: str
+
+
+class DocumentInfo(_AgentModel):
+    """Information about a registered document."""
+    source_id: str
+    version: int
+    chunk_count: int
+    page_count: int
+    last_ingested_at: str
+    content_hash: str
+
+
+class SyncStatusResponse(_AgentModel):
+    """Response model for /sync/status endpoint."""
+    registered_documents: int
+    total_chunks: int
+    vector_store_count: int
+    documents: list[DocumentInfo]
+
+
+class HealthResponse(_AgentModel):
+    """Response model for /health endpoint."""
+    status: str
+    vector_store_ready: bool
+    documents_count: int
+    registered_documents: int = 0
+    sync_ready: bool = True
\ No newline at end of file
@@ -6,6 +6,11 @@ from .prompts import (
     format_chunk_for_prompt,
     format_chunk,
     format_retrieved_chunks,
+    format_chunk_rows,
+    format_json_objects,
+    render_session_summary,
+    render_hybrid_prompt,
+    render_doc_only_prompt,
     build_user_prompt,
     build_user_prompt_doc_only,
 )
@@ -18,6 +23,11 @@ __all__ = [
     "format_chunk_for_prompt",
     "format_chunk",
     "format_retrieved_chunks",
+    "format_chunk_rows",
+    "format_json_objects",
+    "render_session_summary",
+    "render_hybrid_prompt",
+    "render_doc_only_prompt",
     "build_user_prompt",
     "build_user_prompt_doc_only",
     "build_chains",
@@ -27,22 +37,38 @@ __all__ = [
     "astream_hybrid",
     "DOC_ONLY_EMPTY_MESSAGE",
     "retrieve",
+    "retrieve_many",
+    "clear_retrieval_cache",
     "postprocess",
     "run_answer",
     "stream_answer_ndjson",
 ]
 
 
+# Lazily loaded name -> submodule. LangChain-dependent modules are imported on first access only.
+_LAZY_ATTRS = {
+    **dict.fromkeys(
+        ("HYBRID_PROMPT", "DOC_ONLY_PROMPT", "build_chains", "invoke_doc_only", "invoke_hybrid",
+         "astream_doc_only", "astream_hybrid", "DOC_ONLY_EMPTY_MESSAGE"),
+        "chains",
+    ),
+    "retrieve": "retrieval",
+    "retrieve_many": "retrieval",
+    "clear_retrieval_cache": "retrieval",
+    "run_answer": "orchestrator",
+    "stream_answer_ndjson": "orchestrator",
+}
+
+
 def __getattr__(name: str):
     """Lazy load LangChain-dependent modules so tests can import prompts/postprocess only."""
-    if name in ("HYBRID_PROMPT", "DOC_ONLY_PROMPT", "build_chains", "invoke_doc_only", "invoke_hybrid",
-                "astream_doc_only", "astream_hybrid", "DOC_ONLY_EMPTY_MESSAGE"):
-        from . import chains
-        return getattr(chains, name)
-    if name == "retrieve":
-        from . import retrieval
-        return getattr(retrieval, name)
-    if name in ("run_answer", "stream_answer_ndjson"):
-        from . import orchestrator
-        return getattr(orchestrator, name)
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    # Cache as a module global so later lookups never reach __getattr__.
+    globals()[name] = value
+    return value
@@ -1,31 +1,39 @@
 """LCEL Runnables: doc_only_chain and hybrid_chain with sync + astream helpers."""
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableSequence
+from langchain_core.runnables import RunnableLambda, RunnableSequence
 from langchain_openai import ChatOpenAI
 
-from langchain_core.prompts import ChatPromptTemplate
-
 from .prompts import (
     SYSTEM_PROMPT,
-    HYBRID_HUMAN_TEMPLATE,
-    DOC_ONLY_HUMAN_TEMPLATE,
-    format_chunk_for_prompt,
+    format_chunk_rows,
+    format_json_objects,
+    render_doc_only_prompt,
+    render_hybrid_prompt,
+    render_session_summary,
 )
 
-HYBRID_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", SYSTEM_PROMPT),
-    ("human", HYBRID_HUMAN_TEMPLATE),
-])
-DOC_ONLY_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", SYSTEM_PROMPT),
-    ("human", DOC_ONLY_HUMAN_TEMPLATE),
-])
+# The system message has no variables: build it once. It is always the first message, so every
+# request shares the same byte-identical prefix for the provider's prompt cache. Human messages
+# are rendered from templates precompiled in prompts.py instead of re-parsing a ChatPromptTemplate.
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+
+def _hybrid_messages(inputs: dict[str, Any]) -> list[BaseMessage]:
+    return [_SYSTEM_MESSAGE, HumanMessage(content=render_hybrid_prompt(inputs))]
+
+
+def _doc_only_messages(inputs: dict[str, Any]) -> list[BaseMessage]:
+    return [_SYSTEM_MESSAGE, HumanMessage(content=render_doc_only_prompt(inputs))]
+
+
+HYBRID_PROMPT = RunnableLambda(_hybrid_messages)
+DOC_ONLY_PROMPT = RunnableLambda(_doc_only_messages)
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +46,7 @@ def build_chains(
     api_key: str = "",
     temperature: float = 0.1,
     max_tokens: int = 2000,
+    prompt_cache_key: str = "",
 ) -> tuple[RunnableSequence, RunnableSequence]:
     """Build and return (doc_only_chain, hybrid_chain)."""
     llm = ChatOpenAI(
@@ -45,6 +54,8 @@ def build_chains(
         temperature=temperature,
         max_tokens=max_tokens,
         api_key=api_key or None,
+        # Request body field, not a create() kwarg: older openai SDKs reject unknown kwargs.
+        extra_body={"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None,
     )
     doc_chain = DOC_ONLY_PROMPT | llm | StrOutputParser()
     hybrid_chain_inst = HYBRID_PROMPT | llm | StrOutputParser()
@@ -62,16 +73,20 @@ def _format_retrieved_chunks(chunks: list[dict], empty_message: str | None = Non
     """Format retrieved chunks for prompt."""
     if not chunks:
         return empty_message or "No relevant excerpts found."
-    formatted = []
-    for c in chunks:
-        formatted.append(format_chunk_for_prompt(
-            chunk_id=c.get("id", c.get("chunk_id", "unknown")),
-            source=c.get("source", "unknown"),
-            page=c.get("page"),
-            section=c.get("section"),
-            text=c.get("text", c.get("page_content", "")),
-        ))
-    return "\n\n".join(formatted)
+    # Chunks from one retriever share a shape: pick the id/text keys once, not per chunk.
+    first = chunks[0]
+    id_key = "id" if "id" in first else "chunk_id"
+    text_key = "text" if "text" in first else "page_content"
+    return format_chunk_rows(tuple(
+        (
+            c.get(id_key, "unknown"),
+            c.get("source", "unknown"),
+            c.get("page"),
+            c.get("section"),
+            c.get(text_key, ""),
+        )
+        for c in chunks
+    ))
 
 
 def invoke_doc_only(question: str, retrieved_chunks: list[dict]) -> str:
@@ -85,47 +100,36 @@ def invoke_doc_only(question: str, retrieved_chunks: list[dict]) -> str:
     })
 
 
+def _hybrid_inputs(
+    question: str,
+    json_objects: list[dict],
+    session_summary: dict,
+    retrieved_chunks: list[dict],
+    rendered: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Prompt variables for hybrid_chain (shared by invoke and astream). rendered: precomputed
+    render_session_summary(session_summary) from the graph; rendered here when not given."""
+    return {
+        "question": question,
+        "json_objects_pretty": format_json_objects(json_objects),
+        **(rendered if rendered is not None else render_session_summary(session_summary)),
+        "retrieved_chunks_formatted": _format_retrieved_chunks(retrieved_chunks),
+    }
+
+
 def invoke_hybrid(
     question: str,
     json_objects: list[dict],
     session_summary: dict,
     retrieved_chunks: list[dict],
+    rendered: dict[str, str] | None = None,
 ) -> str:
     """Sync invoke hybrid_chain."""
     if not hybrid_chain:
         raise RuntimeError("Chains not built; call build_chains() first")
-    json_pretty = json.dumps(json_objects, indent=2) if json_objects else "[]"
-    layer_counts = session_summary.get("layer_counts", {})
-    layer_counts_str = ", ".join(f"{k}={v}" for k, v in layer_counts.items()) if layer_counts else "None"
-    limitations = session_summary.get("limitations", [])
-    limitations_str = ", ".join(limitations) if limitations else "None"
-    
-    # Format spatial analysis for prompt
-    spatial_analysis = session_summary.get("spatial_analysis")
-    if spatial_analysis:
-        spatial_str_parts = []
-        if spatial_analysis.get("property_highway_analysis"):
-            pha = spatial_analysis["property_highway_analysis"]
-            spatial_str_parts.append(f"Property-Highway: {pha.get('analysis', 'N/A')}")
-        if spatial_analysis.get("available_geometry"):
-            spatial_str_parts.append(f"Layers with geometry: {', '.join(spatial_analysis['available_geometry'])}")
-        if spatial_analysis.get("missing_for_extensions"):
-            spatial_str_parts.append(f"Missing for extensions: {', '.join(spatial_analysis['missing_for_extensions'])}")
-        spatial_analysis_str = "; ".join(spatial_str_parts) if spatial_str_parts else "None"
-    else:
-        spatial_analysis_str = "None"
-    
-    chunks_fmt = _format_retrieved_chunks(retrieved_chunks)
-    return hybrid_chain.invoke({
-        "question": question,
-        "json_objects_pretty": json_pretty,
-        "layer_counts": layer_counts_str,
-        "plot_boundary_present": session_summary.get("plot_boundary_present", False),
-        "highways_present": session_summary.get("highways_present", False),
-        "limitations": limitations_str,
-        "spatial_analysis": spatial_analysis_str,
-        "retrieved_chunks_formatted": chunks_fmt,
-    })
+    return hybrid_chain.invoke(
+        _hybrid_inputs(question, json_objects, session_summary, retrieved_chunks, rendered)
+    )
 
 
 async def astream_doc_only(question: str, retrieved_chunks: list[dict]):
@@ -145,23 +149,12 @@ async def astream_hybrid(
     json_objects: list[dict],
     session_summary: dict,
     retrieved_chunks: list[dict],
+    rendered: dict[str, str] | None = None,
 ):
     """Async stream hybrid_chain tokens."""
     if not hybrid_chain:
         raise RuntimeError("Chains not built; call build_chains() first")
-    json_pretty = json.dumps(json_objects, indent=2) if json_objects else "[]"
-    layer_counts = session_summary.get("layer_counts", {})
-    layer_counts_str = ", ".join(f"{k}={v}" for k, v in layer_counts.items()) if layer_counts else "None"
-    limitations = session_summary.get("limitations", [])
-    limitations_str = ", ".join(limitations) if limitations else "None"
-    chunks_fmt = _format_retrieved_chunks(retrieved_chunks)
-    async for chunk in hybrid_chain.astream({
-        "question": question,
-        "json_objects_pretty": json_pretty,
-        "layer_counts": layer_counts_str,
-        "plot_boundary_present": session_summary.get("plot_boundary_present", False),
-        "highways_present": session_summary.get("highways_present", False),
-        "limitations": limitations_str,
-        "retrieved_chunks_formatted": chunks_fmt,
-    }):
+    async for chunk in hybrid_chain.astream(
+        _hybrid_inputs(question, json_objects, session_summary, retrieved_chunks, rendered)
+    ):
         yield chunk
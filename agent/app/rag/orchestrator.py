@@ -1,39 +1,80 @@
 """Answer orchestration: run_answer (sync) and stream_answer_ndjson (async generator)."""
 from __future__ import annotations
 
-import json
+import asyncio
+import io
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from ..models import AnswerRequest, AnswerResponse
+import orjson
+
+from ..guards.doc_only_guard import should_use_retrieved_for_doc_only
+from ..models import AnswerRequest, AnswerResponse, SessionSummary
+
+if TYPE_CHECKING:
+    from ..graph_lc.state import GraphState
 
 logger = logging.getLogger(__name__)
 
+# NDJSON frames are yielded as bytes (StreamingResponse sends them without re-encoding). The
+# constant JSON scaffolding is prebuilt; only the variable values go through orjson.
+_CHUNK_PREFIX = b'{"t":"chunk","c":'
+_ERROR_PREFIX = b'{"t":"error","message":'
+_DONE_PREFIX = b'{"t":"done","answer":'
+_DONE_QUERY_MODE = b',"query_mode":'
+_DONE_SESSION_SUMMARY = b',"session_summary":'
+_FRAME_SUFFIX = b"}\n"
+
+
+def _chunk_frame(text: str) -> bytes:
+    """NDJSON chunk line: {"t":"chunk","c":text}."""
+    return _CHUNK_PREFIX + orjson.dumps(text) + _FRAME_SUFFIX
+
+
+def _error_frame(message: str) -> bytes:
+    """NDJSON error line: {"t":"error","message":message}."""
+    return _ERROR_PREFIX + orjson.dumps(message) + _FRAME_SUFFIX
 
-def _state_to_done_payload(state: dict[str, Any]) -> dict:
-    """Build NDJSON done payload from graph state."""
-    session_summary = state.get("session_summary")
-    if session_summary is not None and hasattr(session_summary, "model_dump"):
-        session_summary = session_summary.model_dump()
-    return {
-        "t": "done",
-        "answer": state.get("answer_text", ""),
-        "query_mode": state.get("query_mode"),
-        "session_summary": session_summary,
-    }
+
+def _done_frame(state: dict[str, Any]) -> bytes:
+    """NDJSON done line written straight from graph state (no intermediate payload dict)."""
+    return b"".join((
+        _DONE_PREFIX, orjson.dumps(state.get("answer_text", "")),
+        _DONE_QUERY_MODE, orjson.dumps(state.get("query_mode")),
+        _DONE_SESSION_SUMMARY, orjson.dumps(state.get("session_summary")),
+        _FRAME_SUFFIX,
+    ))
+
+
+async def _coalesce_tokens(token_stream, every_n: int):
+    """Group every_n streamed tokens into one string so each NDJSON line carries several tokens."""
+    if every_n <= 1:
+        async for token in token_stream:
+            yield token
+        return
+    pending: list[str] = []
+    async for token in token_stream:
+        pending.append(token)
+        if len(pending) >= every_n:
+            yield "".join(pending)
+            pending.clear()
+    if pending:
+        yield "".join(pending)
 
 
 def run_answer(request: AnswerRequest, answer_graph: Any) -> AnswerResponse:
     """Run the LangGraph workflow and return AnswerResponse."""
-    initial_state = {
+    initial_state: GraphState = {
         "question": request.question,
         "session_objects": request.session_objects,
     }
     final_state = answer_graph.invoke(initial_state)
-    return AnswerResponse(
+    # Graph state is produced by our own nodes: skip re-validating it.
+    session_summary = final_state.get("session_summary")
+    return AnswerResponse.model_construct(
         answer=final_state.get("answer_text", ""),
         query_mode=final_state.get("query_mode"),
-        session_summary=final_state.get("session_summary"),
+        session_summary=SessionSummary.model_construct(**session_summary) if session_summary else None,
     )
 
 
@@ -44,52 +85,63 @@ async def stream_answer_ndjson(
 ):
     """
     Async generator: run graph nodes until route, stream LLM via LCEL astream, then finalize.
-    Yields NDJSON lines: {"t":"chunk","c":"..."} then {"t":"done", ...}. On exception yields {"t":"error","message":"..."}.
+    Yields NDJSON lines as bytes: {"t":"chunk","c":"..."} then {"t":"done", ...}. Deterministic answers (guards,
+    doc_only with nothing retrieved) yield only the done line. On exception yields {"t":"error","message":"..."}.
     """
     from ..graph_lc import run_graph_until_route
     from ..graph_lc import nodes as graph_nodes
     from .chains import DOC_ONLY_EMPTY_MESSAGE, astream_doc_only, astream_hybrid
-    from ..guards.doc_only_guard import should_use_retrieved_for_doc_only
 
     try:
-        state = run_graph_until_route(request, reasoning_service, settings)
+        # Pre-LLM nodes are sync (retrieval hits Chroma): run them off the event loop.
+        state = await asyncio.to_thread(run_graph_until_route, request, reasoning_service, settings)
 
         if state.get("guard_result"):
+            # Deterministic answer (smalltalk / geometry guard / follow-up): the done frame
+            # already carries the full answer, so send it as a single line.
             state.update(graph_nodes.finalize_node(state))
-            answer_text = state.get("answer_text", "")
-            yield json.dumps({"t": "chunk", "c": answer_text}) + "\n"
-            yield json.dumps(_state_to_done_payload(state)) + "\n"
+            yield _done_frame(state)
             return
 
         retrieved_docs = state.get("retrieved_docs", [])
         doc_only = state.get("doc_only", False)
-        session_summary = state.get("session_summary")
-        session_summary_dict = session_summary.model_dump() if session_summary else {}
+        session_summary = state.get("session_summary") or {}
 
-        full_answer_chunks = []
+        if doc_only and (
+            not retrieved_docs or not should_use_retrieved_for_doc_only(request.question, retrieved_docs)
+        ):
+            # Nothing usable retrieved: the fixed empty message is a deterministic answer, so it
+            # goes out as the done frame alone (finalize_node is a pass-through off the guard path).
+            state["answer_text"] = DOC_ONLY_EMPTY_MESSAGE
+            yield _done_frame(state)
+            return
+
+        answer_buf = io.StringIO()
         if doc_only:
-            if not retrieved_docs or not should_use_retrieved_for_doc_only(request.question, retrieved_docs):
-                override_msg = DOC_ONLY_EMPTY_MESSAGE
-                state["answer_text"] = override_msg
-                yield json.dumps({"t": "chunk", "c": override_msg}) + "\n"
-            else:
-                async for chunk in astream_doc_only(request.question, retrieved_docs):
-                    full_answer_chunks.append(chunk)
-                    yield json.dumps({"t": "chunk", "c": chunk}) + "\n"
-                state["answer_text"] = "".join(full_answer_chunks)
+            async for chunk in _coalesce_tokens(
+                astream_doc_only(request.question, retrieved_docs),
+                settings.stream_flush_every_n,
+            ):
+                answer_buf.write(chunk)
+                yield _chunk_frame(chunk)
+            state["answer_text"] = answer_buf.getvalue()
         else:
-            async for chunk in astream_hybrid(
-                request.question,
-                request.session_objects,
-                session_summary_dict,
-                retrieved_docs,
+            async for chunk in _coalesce_tokens(
+                astream_hybrid(
+                    request.question,
+                    request.session_objects,
+                    session_summary,
+                    retrieved_docs,
+                    rendered=state.get("session_summary_rendered"),
+                ),
+                settings.stream_flush_every_n,
             ):
-                full_answer_chunks.append(chunk)
-                yield json.dumps({"t": "chunk", "c": chunk}) + "\n"
-            state["answer_text"] = "".join(full_answer_chunks)
+                answer_buf.write(chunk)
+                yield _chunk_frame(chunk)
+            state["answer_text"] = answer_buf.getvalue()
 
         state.update(graph_nodes.finalize_node(state))
-        yield json.dumps(_state_to_done_payload(state)) + "\n"
+        yield _done_frame(state)
     except Exception as e:
         logger.exception("Error streaming answer: %s", e)
-        yield json.dumps({"t": "error", "message": str(e)}) + "\n"
+        yield _error_frame(str(e))
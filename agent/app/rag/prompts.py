@@ -1,7 +1,11 @@
 """Single source of truth for RAG prompt templates (strings). ChatPromptTemplates built in chains.py."""
 from __future__ import annotations
 
-import json
+from collections.abc import Callable
+from functools import lru_cache
+from string import Formatter
+
+import orjson
 
 SYSTEM_PROMPT = """You are a careful assistant that answers user questions by combining:
 (1) retrieved excerpts from planning/regulatory documents (persistent knowledge) and
@@ -74,13 +78,144 @@ Answer the question using ONLY the retrieved excerpts above. Do not refer to any
 Return ONLY your direct answer (no Evidence section, no preamble)."""
 
 
+# --- Precompiled human templates (parsed once at import, rendered by a single join) ---
+
+_Conversion = Callable[[object], str] | None
+_CONVERSIONS: dict[str | None, _Conversion] = {None: None, "s": str, "r": repr, "a": ascii}
+
+_CompiledTemplate = tuple[tuple[str, ...], tuple[tuple[str, str, _Conversion], ...]]
+
+
+def _compile_template(template: str) -> _CompiledTemplate:
+    """
+    Split a str.format template into literal fragments and (name, format_spec, conversion)
+    fields; literals has one extra entry. Brace escapes ("{{", "}}") come back from the parser
+    as field-less entries, so literal text is buffered until the next field.
+    """
+    literals: list[str] = []
+    fields: list[tuple[str, str, _Conversion]] = []
+    buffered: list[str] = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        buffered.append(literal)
+        if field is None:
+            continue
+        if not field.isidentifier() or "{" in (spec or ""):
+            raise ValueError(
+                f"Unsupported template field {field!r}: only named fields without nested specs"
+            )
+        literals.append("".join(buffered))
+        buffered.clear()
+        fields.append((field, spec or "", _CONVERSIONS[conversion]))
+    literals.append("".join(buffered))
+    return tuple(literals), tuple(fields)
+
+
+def _render_compiled(compiled: _CompiledTemplate, values: dict) -> str:
+    literals, fields = compiled
+    parts = [literals[0]]
+    for (name, spec, convert), literal in zip(fields, literals[1:]):
+        value = values[name]
+        if convert is not None:
+            value = convert(value)
+        parts.append(format(value, spec))
+        parts.append(literal)
+    return "".join(parts)
+
+
+_HYBRID_HUMAN_COMPILED = _compile_template(HYBRID_HUMAN_TEMPLATE)
+_DOC_ONLY_HUMAN_COMPILED = _compile_template(DOC_ONLY_HUMAN_TEMPLATE)
+
+
+def render_hybrid_prompt(values: dict) -> str:
+    """Render HYBRID_HUMAN_TEMPLATE; same output as HYBRID_HUMAN_TEMPLATE.format(**values)."""
+    return _render_compiled(_HYBRID_HUMAN_COMPILED, values)
+
+
+def render_doc_only_prompt(values: dict) -> str:
+    """Render DOC_ONLY_HUMAN_TEMPLATE; same output as DOC_ONLY_HUMAN_TEMPLATE.format(**values)."""
+    return _render_compiled(_DOC_ONLY_HUMAN_COMPILED, values)
+
+
+# --- Session JSON formatting (used by chains and build_user_prompt) ---
+
+def format_json_objects(json_objects: list[dict]) -> str:
+    """Pretty-print session objects (2-space indent) for the prompt; "[]" when empty."""
+    if not json_objects:
+        return "[]"
+    return orjson.dumps(json_objects, option=orjson.OPT_INDENT_2).decode()
+
+
+# --- Session summary formatting (used by chains and build_user_prompt) ---
+
+def render_session_summary(session_summary: dict) -> dict[str, str]:
+    """
+    Render the session summary fields of the hybrid prompt (layer_counts, plot_boundary_present,
+    highways_present, limitations, spatial_analysis). Cached on a hashable view of the summary,
+    so repeat questions on an unchanged session skip the string building; each caller gets its
+    own copy of the cached dict.
+    """
+    spatial_analysis = session_summary.get("spatial_analysis") or {}
+    pha = spatial_analysis.get("property_highway_analysis")
+    return dict(_render_session_summary_cached(
+        tuple((session_summary.get("layer_counts") or {}).items()),
+        bool(session_summary.get("plot_boundary_present", False)),
+        bool(session_summary.get("highways_present", False)),
+        tuple(session_summary.get("limitations") or ()),
+        bool(spatial_analysis),
+        pha.get("analysis", "N/A") if pha else None,
+        tuple(spatial_analysis.get("available_geometry") or ()),
+        tuple(spatial_analysis.get("missing_for_extensions") or ()),
+    ))
+
+
+@lru_cache(maxsize=256)
+def _render_session_summary_cached(
+    layer_counts: tuple[tuple[str, int], ...],
+    plot_boundary_present: bool,
+    highways_present: bool,
+    limitations: tuple[str, ...],
+    has_spatial_analysis: bool,
+    property_highway: str | None,
+    available_geometry: tuple[str, ...],
+    missing_for_extensions: tuple[str, ...],
+) -> dict[str, str]:
+    layer_counts_str = ", ".join(f"{k}={v}" for k, v in layer_counts) if layer_counts else "None"
+    limitations_str = ", ".join(limitations) if limitations else "None"
+
+    # Format spatial analysis for prompt
+    spatial_analysis_str = "None"
+    if has_spatial_analysis:
+        spatial_str_parts = []
+        if property_highway is not None:
+            spatial_str_parts.append(f"Property-Highway: {property_highway}")
+        if available_geometry:
+            spatial_str_parts.append(f"Layers with geometry: {', '.join(available_geometry)}")
+        if missing_for_extensions:
+            spatial_str_parts.append(f"Missing for extensions: {', '.join(missing_for_extensions)}")
+        if spatial_str_parts:
+            spatial_analysis_str = "; ".join(spatial_str_parts)
+
+    return {
+        "layer_counts": layer_counts_str,
+        "plot_boundary_present": str(plot_boundary_present),
+        "highways_present": str(highways_present),
+        "limitations": limitations_str,
+        "spatial_analysis": spatial_analysis_str,
+    }
+
+
 # --- Chunk formatting (used by chains and tests) ---
 
 def format_chunk_for_prompt(chunk_id: str, source: str, page: str | None, section: str | None, text: str) -> str:
     """Format a retrieved chunk for the prompt."""
-    page_str = f"p{page}" if page else "p?"
-    section_str = f" | {section}" if section else ""
-    return f"[DOC: {source} | {page_str} | chunk: {chunk_id}{section_str}]\n{text}"
+    return _format_chunk_cached(chunk_id, source, page, section, text)
+
+
+@lru_cache(maxsize=4096)
+def _format_chunk_cached(chunk_id: str, source: str, page: str | None, section: str | None, text: str) -> str:
+    # The same chunks are retrieved across requests; text is part of the key, so re-ingested
+    # chunks with new text never hit a stale entry.
+    return f"[DOC: {source} | p{page or '?'} | chunk: {chunk_id}{f' | {section}' if section else ''}]\n{text}"
 
 
 # Alias for backward compatibility (same behavior as format_chunk_for_prompt).
@@ -91,107 +226,60 @@ def format_retrieved_chunks(chunks: list[dict]) -> str:
     """Format all retrieved chunks for the prompt."""
     if not chunks:
         return "No relevant excerpts found."
-    formatted = []
-    for chunk in chunks:
-        formatted.append(format_chunk(
-            chunk_id=chunk.get("id", "unknown"),
-            source=chunk.get("source", "unknown"),
-            page=chunk.get("page"),
-            section=chunk.get("section"),
-            text=chunk.get("text", "")
-        ))
-    return "\n\n".join(formatted)
-
-
-_USER_PROMPT_TEMPLATE = """User question:
-{question}
-
-Session drawing objects (current JSON):
-{json_objects_pretty}
-
-Derived session summary (computed by the system):
-- Layer counts: {layer_counts}
-- Plot boundary present: {plot_boundary_present}
-- Highways present: {highways_present}
-- Known limitations: {limitations}
-- Spatial analysis: {spatial_analysis}
-
-Retrieved regulatory excerpts (persistent knowledge):
-{retrieved_chunks_formatted}
-
-Task:
-1. **FIRST**: Analyze what CAN be determined from the available geometry and spatial relationships (use the spatial analysis provided).
-2. **SECOND**: Answer the user question using BOTH the retrieved excerpts and the current JSON.
-3. **THIRD**: If the answer depends on geometry (e.g., "fronts a highway"), use the spatial analysis and explain your reasoning steps briefly.
-4. **FOURTH**: If the rule depends on terms (e.g., "principal elevation", "highway"), prefer definitions in the retrieved excerpts.
-5. **IMPORTANT**: Even if some information is missing, provide general rules and explain what CAN be determined from available data. Be helpful and actionable.
-
-Return ONLY your direct answer:
-- Start with what CAN be determined from available geometry (e.g., "Based on the coordinates, this property fronts a highway...").
-- Then provide general rules from the documents that apply.
-- Finally, if information is missing, be specific about what's needed (e.g., "For rear extensions, add a Walls layer with elevation='rear'").
-- One or two paragraphs: your direct answer (short, direct).
-- Do NOT include any inline document references (e.g. [DocName_016_0032 | p16]).
-- If uncertain, state uncertainty and what additional data would resolve it."""
-
-_USER_PROMPT_DOC_ONLY_TEMPLATE = """User question:
-{question}
-
-Retrieved regulatory excerpts (persistent knowledge):
-{retrieved_chunks_formatted}
-
-Task:
-Answer the question using ONLY the retrieved excerpts above. Do not refer to any drawing or session state unless the user explicitly asks about it.
-- Quote short phrases from the excerpts where relevant.
-- Do NOT include inline document references (e.g. [DocName_016_0032 | p16]).
-Return ONLY your direct answer (no Evidence section, no preamble)."""
+    return format_chunk_rows(tuple(
+        (
+            chunk.get("id", "unknown"),
+            chunk.get("source", "unknown"),
+            chunk.get("page"),
+            chunk.get("section"),
+            chunk.get("text", ""),
+        )
+        for chunk in chunks
+    ))
+
+
+@lru_cache(maxsize=256)
+def format_chunk_rows(rows: tuple[tuple[str, str, str | None, str | None, str], ...]) -> str:
+    """
+    Join formatted chunks given as (chunk_id, source, page, section, text) rows. Cached on the
+    whole retrieval result, so re-formatting the same top-k (retries, doc_only vs hybrid) is a lookup.
+    """
+    return "\n\n".join(format_chunk_for_prompt(*row) for row in rows)
 
 
 def build_user_prompt(
     question: str,
     json_objects: list[dict],
     session_summary: dict,
-    retrieved_chunks: list[dict]
+    retrieved_chunks: list[dict],
+    retrieved_chunks_formatted: str | None = None,
+) -> str:
+    """
+    Build the complete user prompt (hybrid: question + JSON + summary + chunks).
+    retrieved_chunks_formatted: format_retrieved_chunks(retrieved_chunks) already computed for
+    this turn (e.g. shared with build_user_prompt_doc_only); formatted here when not given.
+    """
+    json_pretty = format_json_objects(json_objects)
+    summary_strs = render_session_summary(session_summary)
+    if retrieved_chunks_formatted is None:
+        retrieved_chunks_formatted = format_retrieved_chunks(retrieved_chunks)
+    return render_hybrid_prompt({
+        "question": question,
+        "json_objects_pretty": json_pretty,
+        "retrieved_chunks_formatted": retrieved_chunks_formatted,
+        **summary_strs,
+    })
+
+
+def build_user_prompt_doc_only(
+    question: str,
+    retrieved_chunks: list[dict],
+    retrieved_chunks_formatted: str | None = None,
 ) -> str:
-    """Build the complete user prompt (hybrid: question + JSON + summary + chunks)."""
-    json_pretty = json.dumps(json_objects, indent=2) if json_objects else "[]"
-    layer_counts = session_summary.get("layer_counts", {})
-    layer_counts_str = ", ".join(f"{k}={v}" for k, v in layer_counts.items()) if layer_counts else "None"
-    limitations = session_summary.get("limitations", [])
-    limitations_str = ", ".join(limitations) if limitations else "None"
-    
-    # Format spatial analysis for prompt
-    spatial_analysis = session_summary.get("spatial_analysis")
-    if spatial_analysis:
-        spatial_str_parts = []
-        if spatial_analysis.get("property_highway_analysis"):
-            pha = spatial_analysis["property_highway_analysis"]
-            spatial_str_parts.append(f"Property-Highway: {pha.get('analysis', 'N/A')}")
-        if spatial_analysis.get("available_geometry"):
-            spatial_str_parts.append(f"Layers with geometry: {', '.join(spatial_analysis['available_geometry'])}")
-        if spatial_analysis.get("missing_for_extensions"):
-            spatial_str_parts.append(f"Missing for extensions: {', '.join(spatial_analysis['missing_for_extensions'])}")
-        spatial_analysis_str = "; ".join(spatial_str_parts) if spatial_str_parts else "None"
-    else:
-        spatial_analysis_str = "None"
-    
-    chunks_formatted = format_retrieved_chunks(retrieved_chunks)
-    return _USER_PROMPT_TEMPLATE.format(
-        question=question,
-        json_objects_pretty=json_pretty,
-        layer_counts=layer_counts_str,
-        plot_boundary_present=session_summary.get("plot_boundary_present", False),
-        highways_present=session_summary.get("highways_present", False),
-        limitations=limitations_str,
-        spatial_analysis=spatial_analysis_str,
-        retrieved_chunks_formatted=chunks_formatted,
-    )
-
-
-def build_user_prompt_doc_only(question: str, retrieved_chunks: list[dict]) -> str:
     """Build user prompt for definition-only questions: question + retrieved chunks only."""
-    chunks_formatted = format_retrieved_chunks(retrieved_chunks)
-    return _USER_PROMPT_DOC_ONLY_TEMPLATE.format(
-        question=question,
-        retrieved_chunks_formatted=chunks_formatted,
-    )
+    if retrieved_chunks_formatted is None:
+        retrieved_chunks_formatted = format_retrieved_chunks(retrieved_chunks)
+    return render_doc_only_prompt({
+        "question": question,
+        "retrieved_chunks_formatted": retrieved_chunks_formatted,
+    })
@@ -1,7 +1,8 @@
-"""Single retrieval module: retrieve(question) + postprocess(chunks)."""
+"""Single retrieval module: retrieve(question) / retrieve_many(questions) + postprocess(chunks)."""
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Any
 
 from langchain_chroma import Chroma
@@ -30,6 +31,30 @@ def get_vectorstore() -> Chroma:
     return _vectorstore
 
 
+def _chunk_dict(doc_id: Any, text: str | None, meta: dict | None, score: Any) -> dict[str, Any]:
+    """One retrieved chunk: {id, source, page, section, text, distance}."""
+    meta = meta or {}
+    page = meta.get("page")
+    return {
+        "id": meta.get("chunk_id", meta.get("id", str(doc_id if doc_id is not None else "unknown"))),
+        "source": meta.get("source", "unknown"),
+        "page": str(page) if page is not None else None,
+        "section": meta.get("section"),
+        "text": text or "",
+        "distance": _to_distance(score),
+    }
+
+
+def _to_distance(score: Any) -> float | None:
+    """Parse the Chroma score once into a plain float (numpy scalars included); None if unusable."""
+    if score is None:
+        return None
+    try:
+        return float(score)
+    except (TypeError, ValueError):
+        return None
+
+
 def retrieve(
     query: str,
     top_k: int | None = None,
@@ -38,35 +63,79 @@ def retrieve(
     """
     Retrieve documents via LangChain Chroma and postprocess.
     Returns list of chunk dicts: {id, source, page, section, text, distance}.
+    Repeat queries (same text up to whitespace, same k/max_distance) are served from an LRU cache
+    that is cleared whenever the document index changes (clear_retrieval_cache).
+    """
+    settings = get_settings()
+    k = top_k if top_k is not None else settings.retrieval_top_k
+    max_d = max_distance if max_distance is not None else settings.retrieval_max_distance
+    cached = _retrieve_cached(" ".join(query.split()), k, max_d, settings.chroma_collection_name)
+    # Copies: callers own their chunk dicts and must not mutate the cached ones.
+    return [dict(chunk) for chunk in cached]
+
+
+@lru_cache(maxsize=512)
+def _retrieve_cached(
+    query: str,
+    k: int,
+    max_d: float | None,
+    collection_name: str,
+) -> tuple[dict, ...]:
+    # collection_name only keys the cache: a different collection never returns stale results.
+    return tuple(retrieve_many([query], top_k=k, max_distance=max_d)[0])
+
+
+def clear_retrieval_cache() -> None:
+    """Drop cached retrieve() results; call after ingestion/sync changes the vector store."""
+    _retrieve_cached.cache_clear()
+
+
+def retrieve_many(
+    queries: list[str],
+    top_k: int | None = None,
+    max_distance: float | None = None,
+    coarse_k: int | None = None,
+) -> list[list[dict]]:
+    """
+    Retrieve for several queries in one Chroma query (one round-trip, batched query embedding).
+    Returns one postprocessed chunk list per query, in order.
+    coarse_k: two-stage retrieval. Fetch coarse_k candidates per query (e.g. 5 * top_k), let
+    postprocess cap them per page and order them, then keep the best top_k. Without it, pages
+    with many near-duplicate chunks can leave fewer than top_k results after the per-page cap.
+    Opt-in for batch callers only; retrieve() keeps fetching exactly top_k. The distances Chroma
+    returns are already exact per candidate, so ordering by them is the rerank stage.
     """
+    if not queries:
+        return []
     settings = get_settings()
     k = top_k if top_k is not None else settings.retrieval_top_k
     max_d = max_distance if max_distance is not None else settings.retrieval_max_distance
+    n_results = max(k, coarse_k) if coarse_k is not None else k
     vs = get_vectorstore()
-    docs = vs.similarity_search_with_score(query, k=k)
-    chunks: list[dict[str, Any]] = []
-    for doc, score in docs:
-        meta = doc.metadata or {}
-        chunk_id = meta.get("chunk_id", meta.get("id", str(getattr(doc, "id", "unknown"))))
-        source = meta.get("source", "unknown")
-        page = meta.get("page")
-        section = meta.get("section")
-        text = getattr(doc, "page_content", "")
-        distance = score if isinstance(score, (int, float)) else None
-        chunks.append({
-            "id": chunk_id,
-            "source": source,
-            "page": str(page) if page is not None else None,
-            "section": section,
-            "text": text,
-            "distance": distance,
-        })
-    postprocessed = postprocess(chunks, max_distance=max_d)
-    logger.info(
-        "Retrieval: collection=%s, requested_k=%s, raw_chunks=%s, after_postprocess=%s",
-        settings.chroma_collection_name,
-        k,
-        len(chunks),
-        len(postprocessed),
+    # Same query similarity_search_with_score issues (the collection embeds query_texts), batched.
+    result = vs._collection.query(
+        query_texts=list(queries),
+        n_results=n_results,
+        include=["metadatas", "documents", "distances"],
     )
-    return postprocessed
+    out: list[list[dict]] = []
+    for qi in range(len(queries)):
+        chunks = [
+            _chunk_dict(doc_id, text, meta, score)
+            for doc_id, text, meta, score in zip(
+                result["ids"][qi],
+                result["documents"][qi],
+                result["metadatas"][qi],
+                result["distances"][qi],
+            )
+        ]
+        postprocessed = postprocess(chunks, max_distance=max_d)[:k]
+        logger.info(
+            "Retrieval: collection=%s, requested_k=%s, raw_chunks=%s, after_postprocess=%s",
+            settings.chroma_collection_name,
+            k,
+            len(chunks),
+            len(postprocessed),
+        )
+        out.append(postprocessed)
+    return out
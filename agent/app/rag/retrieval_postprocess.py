@@ -1,12 +1,17 @@
 """Postprocess only (no LangChain). Used by retrieval.py and tests."""
 from __future__ import annotations
 
+import heapq
+
 _DISTANCE_NONE = float("inf")
 MAX_CHUNKS_PER_PAGE = 2
 
 
 def _chunk_distance(chunk: dict) -> float:
     d = chunk.get("distance")
+    if type(d) is float:
+        # retrieve() already stores a parsed float: skip the conversion
+        return d
     if d is None:
         return _DISTANCE_NONE
     try:
@@ -30,23 +35,26 @@ def postprocess(
     """
     if not chunks:
         return []
+    max_d = None
     if max_distance is not None:
         try:
             max_d = float(max_distance)
         except (TypeError, ValueError):
             max_d = None
-        if max_d is not None:
-            chunks = [c for c in chunks if _chunk_distance(c) <= max_d]
-    by_key: dict[tuple[str, str | None], list[dict]] = {}
-    for c in chunks:
-        key = _source_page_key(c)
-        if key not in by_key:
-            by_key[key] = []
-        lst = by_key[key]
-        lst.append(c)
-        lst.sort(key=_chunk_distance)
-        if len(lst) > max_per_page:
-            lst.pop()
-    deduped = [c for lst in by_key.values() for c in lst]
-    deduped.sort(key=_chunk_distance)
-    return deduped
+    # Per (source, page): a heap of at most max_per_page entries keyed (-distance, -index), so the
+    # root is the worst kept chunk (farthest; later on ties) and is evicted by heappushpop.
+    by_key: dict[tuple[str, str | None], list[tuple[float, int, dict]]] = {}
+    for i, c in enumerate(chunks):
+        d = _chunk_distance(c)
+        if max_d is not None and d > max_d:
+            continue
+        heap = by_key.setdefault(_source_page_key(c), [])
+        if len(heap) < max_per_page:
+            heapq.heappush(heap, (-d, -i, c))
+        else:
+            heapq.heappushpop(heap, (-d, -i, c))
+    # Undecorate to (distance, index, chunk) and sort on plain tuple comparison; indices are
+    # unique, so the chunk dicts themselves are never compared.
+    kept = [(-neg_d, -neg_i, c) for heap in by_key.values() for neg_d, neg_i, c in heap]
+    kept.sort()
+    return [c for _, _, c in kept]
@@ -1,55 +1,74 @@
 """Session reasoning and summary computation."""
 import logging
+import re
 from typing import Any
-from collections import Counter
 
 from .models import SessionSummary
 from .spatial_analysis import analyze_session_spatial_relationships
 
 logger = logging.getLogger(__name__)
 
+# Property keys (lowercased) that count as measurement data
+_MEASUREMENT_KEYS = frozenset({"length", "width", "height", "area", "distance"})
+# Layer-name terms (matched in lowercased names) that mark a plot boundary / highway layer
+_BOUNDARY_RE = re.compile(r"plot|boundary")
+_HIGHWAY_RE = re.compile(r"highway|road")
+
 
 class ReasoningService:
     """Service for computing session summaries and reasoning."""
 
     def compute_session_summary(self, session_objects: list[dict[str, Any]]) -> SessionSummary:
         """Compute a summary of session objects for reasoning."""
+        return SessionSummary(**self.compute_session_summary_dict(session_objects))
+
+    def compute_session_summary_dict(self, session_objects: list[dict[str, Any]]) -> dict[str, Any]:
+        """Same fields as compute_session_summary, as a plain dict (what the answer graph carries)."""
         if not session_objects:
-            return SessionSummary(
-                layer_counts={},
-                plot_boundary_present=False,
-                highways_present=False,
-                total_objects=0,
-                limitations=["No session objects provided"]
-            )
-        
-        # Count layers
-        layers = []
+            return {
+                "layer_counts": {},
+                "plot_boundary_present": False,
+                "highways_present": False,
+                "total_objects": 0,
+                "limitations": ["No session objects provided"],
+                "spatial_analysis": None,
+            }
+        
+        # Single pass over the objects: layer counts plus the measurement/coordinate probes
+        # that feed the limitations (each probe stops being evaluated once it has matched).
+        layer_counts: dict[str, int] = {}
+        has_measurements = False
+        has_coordinates = False
         for obj in session_objects:
             layer = obj.get("layer", obj.get("Layer", "Unknown"))
-            layers.append(layer)
-        
-        layer_counts = dict(Counter(layers))
-        
-        # Check for specific layers
-        layer_names_lower = [l.lower() for l in layers]
-        plot_boundary_present = any("plot" in l or "boundary" in l for l in layer_names_lower)
-        highways_present = any("highway" in l or "road" in l for l in layer_names_lower)
-        
+            layer_counts[layer] = layer_counts.get(layer, 0) + 1
+            if not has_measurements:
+                props = obj.get("properties", obj.get("Properties", {}))
+                if isinstance(props, dict):
+                    has_measurements = any(k.lower() in _MEASUREMENT_KEYS for k in props)
+            if not has_coordinates:
+                has_coordinates = self._object_has_geometry(obj)
+
+        # Check for specific layers: one regex scan over the distinct lowercased names
+        # (newline-joined; no term contains a newline, so matches never span two names)
+        layer_names_lower = "\n".join(l.lower() for l in layer_counts)
+        plot_boundary_present = _BOUNDARY_RE.search(layer_names_lower) is not None
+        highways_present = _HIGHWAY_RE.search(layer_names_lower) is not None
+
         # Detect limitations
-        limitations = self._detect_limitations(session_objects, layer_counts)
-        
+        limitations = self._detect_limitations(plot_boundary_present, has_measurements, has_coordinates)
+
         # Analyze spatial relationships
         spatial_analysis = analyze_session_spatial_relationships(session_objects)
         
-        return SessionSummary(
-            layer_counts=layer_counts,
-            plot_boundary_present=plot_boundary_present,
-            highways_present=highways_present,
-            total_objects=len(session_objects),
-            limitations=limitations,
-            spatial_analysis=spatial_analysis
-        )
+        return {
+            "layer_counts": layer_counts,
+            "plot_boundary_present": plot_boundary_present,
+            "highways_present": highways_present,
+            "total_objects": len(session_objects),
+            "limitations": limitations,
+            "spatial_analysis": spatial_analysis,
+        }
     
     def _object_has_geometry(self, obj: dict[str, Any]) -> bool:
         """
@@ -83,42 +102,19 @@ class ReasoningService:
 
     def _detect_limitations(
         self,
-        objects: list[dict[str, Any]],
-        layer_counts: dict[str, int]
+        plot_boundary_present: bool,
+        has_measurements: bool,
+        has_coordinates: bool,
     ) -> list[str]:
-        """Detect limitations in the session data."""
+        """Detect limitations in the session data (from flags gathered in compute_session_summary_dict)."""
         limitations = []
-        
-        # Check for missing common layers
-        layer_names = set(layer_counts.keys())
-        layer_names_lower = {l.lower() for l in layer_names}
-        
-        if not any("plot" in l or "boundary" in l for l in layer_names_lower):
+        if not plot_boundary_present:
             limitations.append("No plot boundary defined")
-        
-        # Check for missing measurements
-        has_measurements = False
-        for obj in objects:
-            props = obj.get("properties", obj.get("Properties", {}))
-            if isinstance(props, dict):
-                if any(k.lower() in ["length", "width", "height", "area", "distance"] 
-                       for k in props.keys()):
-                    has_measurements = True
-                    break
-        
         if not has_measurements:
             limitations.append("No measurement data found in objects")
-        
-        # Check for coordinate data: geometry must be non-null and contain coordinate arrays
-        has_coordinates = False
-        for obj in objects:
-            if self._object_has_geometry(obj):
-                has_coordinates = True
-                break
-        
+        # Coordinate data: geometry must be non-null and contain coordinate arrays
         if not has_coordinates:
             limitations.append("No coordinate/geometry data found")
-        
         return limitations
 
     def validate_json_schema(self, session_objects: list[dict[str, Any]]) -> list[str]:
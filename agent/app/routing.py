@@ -3,6 +3,8 @@ Determines which evidence to use and whether to run retrieval.
 """
 from __future__ import annotations
 
+import re
+from functools import lru_cache
 from typing import Literal
 
 # Query mode for evidence pipeline
@@ -63,6 +65,18 @@ _JSON_ONLY_PATTERNS = (
 )
 
 
+def _alternation(phrases) -> re.Pattern[str]:
+    """One compiled alternation per keyword group: a single C-level scan replaces a loop of `in`
+    checks (prefix groups use str.startswith(tuple) instead)."""
+    return re.compile("|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)))
+
+
+_DRAWING_INTENT_RE = _alternation(_DRAWING_INTENT_KEYWORDS)
+_DEFINITION_PATTERN_RE = _alternation(_DEFINITION_PATTERNS)
+_JSON_ONLY_PATTERN_RE = _alternation(_JSON_ONLY_PATTERNS)
+_OBJECT_PROPERTY_RE = _alternation(("width of ", "height of ", "area of ", "name of "))
+
+
 def _normalize(text: str) -> str:
     """Normalize for matching: strip and lowercase."""
     return (text or "").strip().lower()
@@ -79,21 +93,20 @@ def is_definition_only_question(question: str) -> bool:
     normalized = _normalize(question)
     if not normalized:
         return False
+    return _is_definition_only_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _is_definition_only_normalized(normalized: str) -> bool:
+    """Cached core of is_definition_only_question; expects non-empty normalized text."""
     # Object property from session (width/height/area/name of X) is not a definition question
-    if "what is the " in normalized and any(
-        p in normalized for p in ("width of ", "height of ", "area of ", "name of ")
-    ):
+    if "what is the " in normalized and _OBJECT_PROPERTY_RE.search(normalized):
+        return False
+    if _DRAWING_INTENT_RE.search(normalized):
         return False
-    for keyword in _DRAWING_INTENT_KEYWORDS:
-        if keyword in normalized:
-            return False
-    for prefix in _DEFINITION_PREFIXES:
-        if normalized.startswith(prefix):
-            return True
-    for pattern in _DEFINITION_PATTERNS:
-        if pattern in normalized:
-            return True
-    return False
+    if normalized.startswith(_DEFINITION_PREFIXES):
+        return True
+    return _DEFINITION_PATTERN_RE.search(normalized) is not None
 
 
 def is_json_only_question(question: str) -> bool:
@@ -107,30 +120,26 @@ def is_json_only_question(question: str) -> bool:
     normalized = _normalize(question)
     if not normalized:
         return False
+    return _is_json_only_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _is_json_only_normalized(normalized: str) -> bool:
+    """Cached core of is_json_only_question; expects non-empty normalized text."""
     # Must not be definition-style (definitions need docs)
-    if is_definition_only_question(question):
+    if _is_definition_only_normalized(normalized):
         return False
-    for prefix in _JSON_ONLY_PREFIXES:
-        if normalized.startswith(prefix):
-            return True
-    for pattern in _JSON_ONLY_PATTERNS:
-        if pattern in normalized:
-            return True
-    if "how many " in normalized and ("layer" in normalized or "object" in normalized):
+    # Prefixes include the object-property forms ("how wide is X", "area of X", ...)
+    if normalized.startswith(_JSON_ONLY_PREFIXES):
         return True
-    if "what layer" in normalized or "which layer" in normalized:
+    if _JSON_ONLY_PATTERN_RE.search(normalized):
         return True
-    # Object property from drawing: "what is the width/height/area of X", "how wide is X", etc.
-    if "what is the " in normalized and any(
-        p in normalized for p in ("width of ", "height of ", "area of ", "name of ")
-    ):
+    if "how many " in normalized and ("layer" in normalized or "object" in normalized):
         return True
-    if any(
-        normalized.startswith(p)
-        for p in ("how wide is ", "what's the width of ", "width of ", "how tall is ", "what's the height of ", "height of ", "what's the area of ", "area of ")
-    ):
+    if "what layer" in normalized or "which layer" in normalized:
         return True
-    return False
+    # Object property from drawing: "what is the width/height/area of X"
+    return "what is the " in normalized and _OBJECT_PROPERTY_RE.search(normalized) is not None
 
 
 def get_query_mode(question: str) -> QueryMode:
@@ -140,8 +149,17 @@ def get_query_mode(question: str) -> QueryMode:
     """
     if not question or not isinstance(question, str):
         return "hybrid"
-    if is_definition_only_question(question):
+    normalized = _normalize(question)
+    if not normalized:
+        return "hybrid"
+    return _query_mode_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _query_mode_normalized(normalized: str) -> QueryMode:
+    """Cached core of get_query_mode; expects non-empty normalized text."""
+    if _is_definition_only_normalized(normalized):
         return "doc_only"
-    if is_json_only_question(question):
+    if _is_json_only_normalized(normalized):
         return "json_only"
     return "hybrid"
@@ -3,12 +3,17 @@ When detected, the agent returns a short friendly response without running RAG o
 """
 from __future__ import annotations
 
+import re
+from functools import lru_cache
+
 # Domain keywords: if any appear in the message, do NOT treat as small talk
 DOMAIN_KEYWORDS = (
     "property", "highway", "plot", "boundary", "elevation",
     "planning", "development", "wall", "window", "door",
     "json", "layer",
 )
+# Substring match (as before: "walls" still hits "wall"), compiled once into one alternation
+_DOMAIN_RE = re.compile("|".join(map(re.escape, DOMAIN_KEYWORDS)))
 
 SMALLTALK_MAX_WORDS = 4
 
@@ -52,9 +57,7 @@ def _normalize(message: str) -> str:
 
 def _strip_trailing_punctuation(text: str) -> str:
     """Remove trailing punctuation for phrase matching."""
-    while text and text[-1] in ".,!?;:":
-        text = text[:-1]
-    return text.strip()
+    return text.rstrip(".,!?;:").strip()
 
 
 def is_smalltalk(message: str) -> bool:
@@ -69,11 +72,16 @@ def is_smalltalk(message: str) -> bool:
     normalized = _normalize(message)
     if not normalized:
         return False
+    return _is_smalltalk_normalized(normalized)
+
+
+@lru_cache(maxsize=4096)
+def _is_smalltalk_normalized(normalized: str) -> bool:
+    """Cached core of is_smalltalk; expects a non-empty normalized message."""
     words = normalized.split()
     if len(words) > SMALLTALK_MAX_WORDS:
         return False
-    for keyword in DOMAIN_KEYWORDS:
-        if keyword in normalized:
-            return False
+    if _DOMAIN_RE.search(normalized):
+        return False
     phrase = _strip_trailing_punctuation(normalized)
     return phrase in SMALLTALK_PHRASES
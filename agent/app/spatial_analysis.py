@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import Any
 import math
 
+_INF = math.inf
+
 
 def analyze_property_highway_relationship(
     plot_boundary: dict[str, Any],
@@ -99,27 +101,8 @@ def _check_fronting(
     if not plot_points or not highway_points:
         return False, None, "Insufficient points"
     
-    # Find minimum distance from plot boundary to highway
-    min_distance = float('inf')
-    closest_plot_point = None
-    closest_highway_point = None
-    
-    for plot_pt in plot_points:
-        for highway_pt in highway_points:
-            dist = math.sqrt((plot_pt[0] - highway_pt[0])**2 + (plot_pt[1] - highway_pt[1])**2)
-            if dist < min_distance:
-                min_distance = dist
-                closest_plot_point = plot_pt
-                closest_highway_point = highway_pt
-    
-    # Also check distance to highway line segments (not just points)
-    for i in range(len(highway_points) - 1):
-        seg_start = highway_points[i]
-        seg_end = highway_points[i + 1]
-        for plot_pt in plot_points:
-            dist = _point_to_line_segment_distance(plot_pt, seg_start, seg_end)
-            if dist < min_distance:
-                min_distance = dist
+    # Find minimum distance from plot boundary to highway (squared in the kernel; one sqrt here)
+    min_distance = math.sqrt(_min_distance_sq(plot_points, highway_points))
     
     # Consider "fronting" if distance is very small (< 1 unit, or configurable threshold)
     threshold = 1.0
@@ -127,41 +110,49 @@ def _check_fronting(
     
     if fronts:
         analysis = f"Property fronts highway (distance: {min_distance:.2f} units)"
-    elif min_distance < float('inf'):
+    elif min_distance < _INF:
         analysis = f"Property is {min_distance:.2f} units from highway (does not front)"
     else:
         analysis = "Cannot determine fronting relationship"
     
-    return fronts, min_distance if min_distance < float('inf') else None, analysis
+    return fronts, min_distance if min_distance < _INF else None, analysis
 
 
-def _point_to_line_segment_distance(
-    point: tuple[float, float],
-    line_start: tuple[float, float],
-    line_end: tuple[float, float]
+def _min_distance_sq(
+    plot_points: list[tuple[float, float]],
+    highway_points: list[tuple[float, float]]
 ) -> float:
-    """Calculate distance from point to line segment."""
-    px, py = point
-    x1, y1 = line_start
-    x2, y2 = line_end
-    
-    # Vector from line_start to line_end
-    dx = x2 - x1
-    dy = y2 - y1
-    
-    # If line segment is a point
-    if dx == 0 and dy == 0:
-        return math.sqrt((px - x1)**2 + (py - y1)**2)
-    
-    # Parameter t for closest point on line segment
-    t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
-    
-    # Closest point on line segment
-    closest_x = x1 + t * dx
-    closest_y = y1 + t * dy
+    """
+    Squared minimum distance from any plot point to any highway vertex or highway segment.
+    Tight pure-Python kernel: squared distances throughout, segment projection inlined, and
+    segment constants (dx, dy, length squared) computed once per segment, not per plot point.
+    """
+    best = _INF
+    for px, py in plot_points:
+        for hx, hy in highway_points:
+            d2 = (px - hx)**2 + (py - hy)**2
+            if d2 < best:
+                if d2 == 0:
+                    # Shared vertex: nothing can be closer, skip the remaining pairs and segments
+                    return 0.0
+                best = d2
     
-    # Distance
-    return math.sqrt((px - closest_x)**2 + (py - closest_y)**2)
+    # Also check distance to highway line segments (not just points)
+    for (x1, y1), (x2, y2) in zip(highway_points, highway_points[1:]):
+        dx = x2 - x1
+        dy = y2 - y1
+        seg_len_sq = dx * dx + dy * dy
+        if seg_len_sq == 0:
+            # Degenerate segment: a vertex, already covered by the point loop
+            continue
+        for px, py in plot_points:
+            t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / seg_len_sq))
+            d2 = (px - (x1 + t * dx))**2 + (py - (y1 + t * dy))**2
+            if d2 < best:
+                if d2 == 0:
+                    return 0.0
+                best = d2
+    return best
 
 
 def analyze_session_spatial_relationships(session_objects: list[dict[str, Any]]) -> dict[str, Any]:
@@ -182,9 +173,11 @@ def analyze_session_spatial_relationships(session_objects: list[dict[str, Any]])
     # Find plot boundary and highway
     plot_boundary = None
     highway = None
+    layers_present = set()  # lowercased once per object, reused for the extension check below
     
     for obj in session_objects:
         layer = obj.get("layer", "").lower()
+        layers_present.add(layer)
         geometry = obj.get("geometry")
         
         # Check if geometry exists and has coordinates
@@ -210,8 +203,6 @@ def analyze_session_spatial_relationships(session_objects: list[dict[str, Any]])
             )
     
     # Check what's missing for extension questions
-    layers_present = {obj.get("layer", "").lower() for obj in session_objects}
-    
     if "walls" not in layers_present:
         result["missing_for_extensions"].append("Walls layer (needed to determine principal/rear elevation)")
     if "doors" not in layers_present:
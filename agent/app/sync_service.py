@@ -1,7 +1,11 @@
 """Document Sync Service - Idempotent incremental ingestion."""
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .config import get_settings
 from .document_registry import DocumentRegistry, DocumentStatus
@@ -11,7 +15,7 @@ from .vector_store import VectorStoreService
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncResult:
     """Result of a sync operation."""
     new_documents: int = 0
@@ -20,11 +24,7 @@ class SyncResult:
     deleted_documents: int = 0
     total_chunks_added: int = 0
     total_chunks_deleted: int = 0
-    errors: list[str] = None
-    
-    def __post_init__(self):
-        if self.errors is None:
-            self.errors = []
+    errors: list[str] = field(default_factory=list)
     
     @property
     def has_changes(self) -> bool:
@@ -43,6 +43,22 @@ class SyncResult:
         }
 
 
+@dataclass
+class PreparedDocument:
+    """
+    A document hashed, classified and (unless unchanged) extracted + chunked; nothing written
+    yet. chunks stays empty for unchanged documents.
+    """
+    source_id: str
+    content_hash: str
+    status: DocumentStatus
+    page_count: int = 0
+    chunks: list[dict] = field(default_factory=list)
+    file_mtime_ns: int | None = None
+    file_size: int | None = None
+    stat_changed: bool = True
+
+
 class DocumentSyncService:
     """
     Service for synchronizing PDF documents with the vector store.
@@ -64,6 +80,9 @@ class DocumentSyncService:
         self.ingestion = ingestion_service
         self.vector_store = vector_store
         self.settings = get_settings()
+        # One sync at a time: runs happen in worker threads (startup, /ingest) and share the
+        # registry
+        self._lock = threading.Lock()
     
     def sync(self, delete_missing: bool = False) -> SyncResult:
         """
@@ -75,103 +94,206 @@ class DocumentSyncService:
         Returns:
             SyncResult with statistics
         """
-        result = SyncResult()
-        
-        # Get all PDF files from source directory
-        pdf_files = self.ingestion.get_pdf_files()
-        current_sources = {pdf.name for pdf in pdf_files}
-        
-        logger.info(f"Starting sync: {len(pdf_files)} PDF files found")
-        
-        # Process each PDF file
-        for pdf_path in pdf_files:
-            try:
-                self._process_document(pdf_path, result)
-            except Exception as e:
-                error_msg = f"Error processing {pdf_path.name}: {e}"
-                logger.error(error_msg)
-                result.errors.append(error_msg)
-        
-        # Handle deleted documents (optional)
-        if delete_missing:
-            deleted_sources = self.registry.get_deleted_sources(current_sources)
-            for source_id in deleted_sources:
+        with self._lock, self.registry.batch():
+            result = SyncResult()
+            
+            # Get all PDF files from source directory
+            pdf_files = self.ingestion.get_pdf_files()
+            current_sources = frozenset(pdf.name for pdf in pdf_files)
+            
+            logger.info(f"Starting sync: {len(pdf_files)} PDF files found")
+            
+            self._sync_files(pdf_files, result)
+            
+            # Handle deleted documents (optional)
+            if delete_missing:
+                deleted_sources = self.registry.get_deleted_sources(current_sources)
+                self._delete_documents(deleted_sources, result)
+            
+            logger.info(
+                f"Sync complete: {result.new_documents} new, "
+                f"{result.updated_documents} updated, "
+                f"{result.unchanged_documents} unchanged, "
+                f"{result.deleted_documents} deleted"
+            )
+            
+            return result
+    
+    def _sync_files(self, pdf_files: list[Path], result: SyncResult) -> None:
+        """
+        Hash, extract and chunk PDFs in parallel (independent per file). Vector store and
+        registry writes stay on this thread, applied in file order as each file is ready; new
+        chunks are buffered across documents and added in large batches.
+        Pipelined: workers prepare at most 2 * workers files ahead of the commit point, so PDF
+        parsing overlaps embedding while parsed pages for the rest of the corpus are not held.
+        """
+        pending: list[PreparedDocument] = []
+        pending_chunks = 0
+        flush_at = self.settings.sync_flush_chunks
+        workers = max(1, min(self.settings.sync_max_workers, len(pdf_files)))
+        files = iter(pdf_files)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-sync") as executor:
+            in_flight: deque[tuple[Path, Future[PreparedDocument]]] = deque(
+                (pdf_path, executor.submit(self._prepare_document, pdf_path))
+                for pdf_path in islice(files, 2 * workers)
+            )
+            while in_flight:
+                pdf_path, future = in_flight.popleft()
+                next_path = next(files, None)
+                if next_path is not None:
+                    next_future = executor.submit(self._prepare_document, next_path)
+                    in_flight.append((next_path, next_future))
                 try:
-                    self._delete_document(source_id, result)
+                    pending_chunks += self._commit_document(future.result(), result, pending)
                 except Exception as e:
-                    error_msg = f"Error deleting {source_id}: {e}"
+                    error_msg = f"Error processing {pdf_path.name}: {e}"
                     logger.error(error_msg)
                     result.errors.append(error_msg)
-        
-        logger.info(
-            f"Sync complete: {result.new_documents} new, "
-            f"{result.updated_documents} updated, "
-            f"{result.unchanged_documents} unchanged, "
-            f"{result.deleted_documents} deleted"
-        )
-        
-        return result
+                if pending_chunks >= flush_at:
+                    self._flush(pending, result)
+                    pending_chunks = 0
+        self._flush(pending, result)
     
-    def _process_document(self, pdf_path: Path, result: SyncResult) -> None:
-        """Process a single document."""
+    def _prepare_document(self, pdf_path: Path) -> PreparedDocument:
+        """
+        Hash and classify a document; extract and chunk it unless unchanged.
+        Thread-safe: only reads the registry and the file.
+        """
         source_id = pdf_path.name
+        st = pdf_path.stat()
+        if self.registry.matches_file_stat(source_id, st.st_mtime_ns, st.st_size):
+            # Same mtime and size as when last hashed: skip reading the file
+            logger.debug(f"Document {source_id}: file stat unchanged, skipping hash")
+            return PreparedDocument(
+                source_id, "", DocumentStatus.UNCHANGED, stat_changed=False
+            )
+        
         content_hash = self.registry.compute_hash(pdf_path)
         status = self.registry.get_status(source_id, content_hash)
         
         logger.debug(f"Document {source_id}: status={status.value}, hash={content_hash[:8]}...")
         
+        if status == DocumentStatus.UNCHANGED:
+            return PreparedDocument(
+                source_id, content_hash, status,
+                file_mtime_ns=st.st_mtime_ns, file_size=st.st_size,
+            )
+        
+        # Extract and chunk the document
+        pages = self.ingestion.extract_text_from_pdf(pdf_path)
+        chunks = list(self.ingestion.chunk_pages(pages))
+        return PreparedDocument(
+            source_id, content_hash, status, len(pages), chunks,
+            file_mtime_ns=st.st_mtime_ns, file_size=st.st_size,
+        )
+    
+    def _commit_document(
+        self,
+        doc: PreparedDocument,
+        result: SyncResult,
+        pending: list[PreparedDocument],
+    ) -> int:
+        """
+        Apply a prepared document: drop superseded chunks now, queue new chunks for _flush.
+        Returns the number of chunks queued.
+        """
+        source_id = doc.source_id
+        status = doc.status
+        
         if status == DocumentStatus.UNCHANGED:
             result.unchanged_documents += 1
             logger.debug(f"Skipping unchanged document: {source_id}")
-            return
+            if doc.stat_changed:
+                # Touched but same content: remember the new stat so the next sync skips
+                # the hash
+                self.registry.update_file_stat(source_id, doc.file_mtime_ns, doc.file_size)
+            return 0
         
         if status == DocumentStatus.UPDATED:
-            # Delete old chunks first
+            # Chunk ids are positional (source_page_counter), so most old ids come back:
+            # those are overwritten by the upsert in _flush; only ids that no longer exist
+            # are deleted.
             old_chunk_ids = self.registry.get_chunk_ids(source_id)
             if old_chunk_ids:
-                deleted = self.vector_store.delete_by_ids(old_chunk_ids)
+                new_ids = {chunk["id"] for chunk in doc.chunks}
+                stale_ids = [chunk_id for chunk_id in old_chunk_ids if chunk_id not in new_ids]
+                replaced = len(old_chunk_ids) - len(stale_ids)
+                deleted = self.vector_store.delete_by_ids(stale_ids) + replaced
                 result.total_chunks_deleted += deleted
                 logger.info(f"Deleted {deleted} old chunks for updated document: {source_id}")
         
-        # Extract and chunk the document
-        pages = self.ingestion.extract_text_from_pdf(pdf_path)
-        chunks = list(self.ingestion.chunk_pages(pages))
-        
-        if not chunks:
+        if not doc.chunks:
             logger.warning(f"No chunks extracted from {source_id}")
+            return 0
+        
+        pending.append(doc)
+        return len(doc.chunks)
+    
+    def _flush(self, pending: list[PreparedDocument], result: SyncResult) -> None:
+        """
+        Add the chunks of all pending documents in one add_documents call (an upsert when an
+        updated document reuses chunk ids), then register each document. A document is
+        registered only after its chunks are stored; if the add fails, every pending document
+        is reported and left unregistered so the next sync retries it.
+        """
+        if not pending:
             return
+        docs = pending[:]
+        pending.clear()
         
         # Add to vector store
-        chunk_ids = [chunk["id"] for chunk in chunks]
-        self.vector_store.add_documents(chunks)
-        
-        # Register in registry
-        self.registry.register(
-            source_id=source_id,
-            content_hash=content_hash,
-            chunk_ids=chunk_ids,
-            page_count=len(pages)
-        )
-        
-        result.total_chunks_added += len(chunks)
+        try:
+            self.vector_store.add_documents(
+                chain.from_iterable(doc.chunks for doc in docs),
+                upsert=any(doc.status == DocumentStatus.UPDATED for doc in docs),
+            )
+        except Exception as e:
+            for doc in docs:
+                error_msg = f"Error processing {doc.source_id}: {e}"
+                logger.error(error_msg)
+                result.errors.append(error_msg)
+            return
         
-        if status == DocumentStatus.NEW:
-            result.new_documents += 1
-            logger.info(f"Ingested NEW document: {source_id} ({len(chunks)} chunks)")
-        else:
-            result.updated_documents += 1
-            logger.info(f"Re-ingested UPDATED document: {source_id} ({len(chunks)} chunks)")
+        for doc in docs:
+            chunks = doc.chunks
+            # Register in registry
+            self.registry.register(
+                source_id=doc.source_id,
+                content_hash=doc.content_hash,
+                chunk_ids=[chunk["id"] for chunk in chunks],
+                page_count=doc.page_count,
+                file_mtime_ns=doc.file_mtime_ns,
+                file_size=doc.file_size
+            )
+            
+            result.total_chunks_added += len(chunks)
+            
+            if doc.status == DocumentStatus.NEW:
+                result.new_documents += 1
+                logger.info(f"Ingested NEW document: {doc.source_id} ({len(chunks)} chunks)")
+            else:
+                result.updated_documents += 1
+                logger.info(f"Re-ingested UPDATED document: {doc.source_id} ({len(chunks)} chunks)")
     
-    def _delete_document(self, source_id: str, result: SyncResult) -> None:
-        """Delete a document that no longer exists in source."""
-        chunk_ids = self.registry.unregister(source_id)
+    def _delete_documents(self, source_ids: list[str], result: SyncResult) -> None:
+        """
+        Delete documents that no longer exist in source: unregister each, then one bulk
+        delete of their chunks.
+        """
+        chunk_ids: list[str] = []
+        for source_id in source_ids:
+            try:
+                chunk_ids.extend(self.registry.unregister(source_id))
+            except Exception as e:
+                error_msg = f"Error deleting {source_id}: {e}"
+                logger.error(error_msg)
+                result.errors.append(error_msg)
+                continue
+            result.deleted_documents += 1
+            logger.info(f"Deleted document no longer in source: {source_id}")
         
         if chunk_ids:
-            deleted = self.vector_store.delete_by_ids(chunk_ids)
-            result.total_chunks_deleted += deleted
-        
-        result.deleted_documents += 1
-        logger.info(f"Deleted document no longer in source: {source_id}")
+            result.total_chunks_deleted += self.vector_store.delete_by_ids(chunk_ids)
     
     def force_reingest(self, source_id: str | None = None) -> SyncResult:
         """
@@ -180,28 +302,24 @@ class DocumentSyncService:
         Args:
             source_id: Specific document to re-ingest, or None for all
         """
-        if source_id:
-            # Clear specific document from registry to force re-ingest
-            self.registry.unregister(source_id)
-            # Find and process that specific file
-            pdf_files = [
-                f for f in self.ingestion.get_pdf_files() 
-                if f.name == source_id
-            ]
-        else:
-            # Clear entire registry and vector store
-            self.registry.clear()
-            self.vector_store.clear()
-            pdf_files = self.ingestion.get_pdf_files()
-        
-        result = SyncResult()
-        for pdf_path in pdf_files:
-            try:
-                self._process_document(pdf_path, result)
-            except Exception as e:
-                result.errors.append(f"Error processing {pdf_path.name}: {e}")
-        
-        return result
+        with self._lock, self.registry.batch():
+            if source_id:
+                # Clear specific document from registry to force re-ingest
+                self.registry.unregister(source_id)
+                # Find and process that specific file
+                pdf_files = [
+                    f for f in self.ingestion.get_pdf_files() 
+                    if f.name == source_id
+                ]
+            else:
+                # Clear entire registry and vector store
+                self.registry.clear()
+                self.vector_store.clear()
+                pdf_files = self.ingestion.get_pdf_files()
+            
+            result = SyncResult()
+            self._sync_files(pdf_files, result)
+            return result
     
     def get_status(self) -> dict:
         """Get current sync status."""
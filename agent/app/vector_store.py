@@ -1,5 +1,9 @@
 """ChromaDB vector store service."""
 import logging
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from itertools import count, islice
 from pathlib import Path
 
 from .config import get_settings
@@ -15,8 +19,16 @@ class VectorStoreService:
         settings = get_settings()
         self.persist_directory = Path(settings.chroma_persist_directory)
         self.collection_name = settings.chroma_collection_name
+        self.add_batch_size = settings.chroma_add_batch_size
         
         self.client = get_chroma_client()
+        # Cached collection.count(); reset by every write through this service. Sync writes run
+        # in a worker thread while /health reads count(): a count is only cached if no write was
+        # in progress and none started or finished while it was read (write generation).
+        self._count_cache: int | None = None
+        self._count_lock = threading.Lock()
+        self._write_generation = 0
+        self._writes_in_progress = 0
         
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -25,45 +37,62 @@ class VectorStoreService:
         )
         
         logger.info(f"Vector store initialized at {self.persist_directory}")
-        logger.info(f"Collection '{self.collection_name}' has {self.collection.count()} documents")
+        logger.info(f"Collection '{self.collection_name}' has {self.count()} documents")
     
-    def add_documents(self, chunks: list[dict]) -> int:
-        """Add document chunks to the vector store."""
-        if not chunks:
-            logger.warning("No chunks provided to add")
-            return 0
-        
-        ids = [chunk["id"] for chunk in chunks]
-        documents = [chunk["text"] for chunk in chunks]
-        # ChromaDB doesn't accept None values in metadata - filter them out
-        metadatas = [
-            {k: v for k, v in chunk["metadata"].items() if v is not None}
-            for chunk in chunks
-        ]
-        
-        # Add in batches to avoid memory issues
-        batch_size = 100
+    def add_documents(self, chunks: Iterable[dict], upsert: bool = False) -> int:
+        """
+        Add document chunks to the vector store (upsert=True overwrites chunks with existing ids).
+        chunks may be any iterable (e.g. chained per-document lists); it is consumed batch by batch.
+        """
+        # Add in batches to avoid memory issues and Chroma's max batch size limit. Each batch's
+        # ids/documents/metadatas are built in one pass over the next batch_size chunks, so no
+        # full-size list (of chunks or of their fields) is ever built.
+        batch_size = self._batch_size()
+        chunk_iter = iter(chunks)
         total_added = 0
+        write = self.collection.upsert if upsert else self.collection.add
         
-        for i in range(0, len(chunks), batch_size):
-            batch_ids = ids[i:i + batch_size]
-            batch_docs = documents[i:i + batch_size]
-            batch_meta = metadatas[i:i + batch_size]
-            
-            self.collection.add(
-                ids=batch_ids,
-                documents=batch_docs,
-                metadatas=batch_meta
-            )
-            total_added += len(batch_ids)
-            logger.info(f"Added batch of {len(batch_ids)} documents")
+        with self._writing():
+            for batch_num in count(1):
+                batch_ids = []
+                batch_docs = []
+                batch_meta = []
+                for chunk in islice(chunk_iter, batch_size):
+                    batch_ids.append(chunk["id"])
+                    batch_docs.append(chunk["text"])
+                    # ChromaDB doesn't accept None values in metadata - filter them out
+                    batch_meta.append({k: v for k, v in chunk["metadata"].items() if v is not None})
+                if not batch_ids:
+                    break
+                
+                write(
+                    ids=batch_ids,
+                    documents=batch_docs,
+                    metadatas=batch_meta
+                )
+                total_added += len(batch_ids)
+                logger.info(f"Added batch {batch_num} of {len(batch_ids)} documents")
         
+        if not total_added:
+            logger.warning("No chunks provided to add")
+            return 0
         logger.info(f"Total documents added: {total_added}")
         return total_added
     
+    def _batch_size(self) -> int:
+        """Configured add batch size, never above the Chroma client's max batch size."""
+        batch_size = max(1, self.add_batch_size)
+        get_max = getattr(self.client, "get_max_batch_size", None)
+        if get_max is not None:
+            try:
+                batch_size = min(batch_size, get_max())
+            except Exception:
+                pass
+        return batch_size
+    
     def search(self, query: str, top_k: int = 5) -> list[dict]:
         """Search for relevant documents."""
-        if self.collection.count() == 0:
+        if self.count() == 0:
             logger.warning("Vector store is empty, cannot search")
             return []
         
@@ -77,31 +106,63 @@ class VectorStoreService:
         formatted_results = []
         
         if results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                metadata = results["metadatas"][0][i] if results["metadatas"] else {}
+            # Row 0 of each column once, then zip: no per-result re-indexing
+            ids = results["ids"][0]
+            documents = results["documents"][0] if results["documents"] else [""] * len(ids)
+            metadatas = results["metadatas"][0] if results["metadatas"] else [{}] * len(ids)
+            distances = results["distances"][0] if results["distances"] else [None] * len(ids)
+            for doc_id, text, metadata, distance in zip(ids, documents, metadatas, distances):
                 formatted_results.append({
                     "id": doc_id,
-                    "text": results["documents"][0][i] if results["documents"] else "",
+                    "text": text,
                     "source": metadata.get("source", "unknown"),
                     "page": metadata.get("page"),
                     "section": metadata.get("section"),
-                    "distance": results["distances"][0][i] if results["distances"] else None
+                    "distance": distance
                 })
         
         logger.info(f"Search returned {len(formatted_results)} results for query: {query[:50]}...")
         return formatted_results
     
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Mark a write to the collection: the count cache is dropped and not refilled until the
+        write ends (also on error: some batches may have landed before a failure).
+        """
+        with self._count_lock:
+            self._writes_in_progress += 1
+            self._write_generation += 1
+            self._count_cache = None
+        try:
+            yield
+        finally:
+            with self._count_lock:
+                self._writes_in_progress -= 1
+                self._write_generation += 1
+                self._count_cache = None
+    
     def count(self) -> int:
-        """Get the number of documents in the collection."""
-        return self.collection.count()
+        """Get the number of documents in the collection (cached until the next write)."""
+        with self._count_lock:
+            if self._count_cache is not None:
+                return self._count_cache
+            generation = self._write_generation
+            cacheable = not self._writes_in_progress
+        n = self.collection.count()
+        with self._count_lock:
+            if cacheable and generation == self._write_generation:
+                self._count_cache = n
+        return n
     
     def clear(self) -> None:
         """Clear all documents from the collection."""
-        self.client.delete_collection(self.collection_name)
-        self.collection = self.client.create_collection(
-            name=self.collection_name,
-            metadata={"description": "Planning/regulatory documents for RAG"}
-        )
+        with self._writing():
+            self.client.delete_collection(self.collection_name)
+            self.collection = self.client.create_collection(
+                name=self.collection_name,
+                metadata={"description": "Planning/regulatory documents for RAG"}
+            )
         logger.info("Vector store cleared")
     
     def delete_by_ids(self, chunk_ids: list[str]) -> int:
@@ -110,7 +171,8 @@ class VectorStoreService:
             return 0
         
         try:
-            self.collection.delete(ids=chunk_ids)
+            with self._writing():
+                self.collection.delete(ids=chunk_ids)
             logger.info(f"Deleted {len(chunk_ids)} chunks from vector store")
             return len(chunk_ids)
         except Exception as e:
@@ -127,7 +189,8 @@ class VectorStoreService:
             )
             
             if results["ids"]:
-                self.collection.delete(ids=results["ids"])
+                with self._writing():
+                    self.collection.delete(ids=results["ids"])
                 logger.info(f"Deleted {len(results['ids'])} chunks for source: {source}")
                 return len(results["ids"])
             return 0
@@ -137,4 +200,4 @@ class VectorStoreService:
     
     def is_ready(self) -> bool:
         """Check if vector store has documents."""
-        return self.collection.count() > 0
+        return self.count() > 0
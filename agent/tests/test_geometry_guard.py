@@ -42,6 +42,17 @@ class TestShouldTriggerGeometryGuard:
         assert should_trigger_geometry_guard("What is the distance to the highway?") is False
         assert should_trigger_geometry_guard("When is a property said to front?") is False
 
+    def test_repeat_question_served_from_cache(self):
+        """Same question up to case/whitespace is classified once."""
+        from app.guards.geometry_guard import _should_trigger_normalized
+
+        _should_trigger_normalized.cache_clear()
+        assert should_trigger_geometry_guard("Does this property front a highway?") is True
+        assert should_trigger_geometry_guard("  DOES THIS PROPERTY FRONT A HIGHWAY? ") is True
+        info = _should_trigger_normalized.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
 
 class TestIsSpatialQuestion:
     """is_spatial_question: spatial questions True, definition-only False."""
@@ -77,6 +88,13 @@ class TestRequiredLayersForQuestion:
         assert "Walls" in required
         assert "Doors" in required
 
+    def test_walls_keyword_and_fresh_set_per_call(self):
+        """Cached matching still hands each caller its own mutable set."""
+        first = required_layers_for_question("Do the walls touch the boundary?")
+        assert first == {"Highway", "Plot Boundary", "Walls"}
+        first.add("Mutated")
+        assert "Mutated" not in required_layers_for_question("Do the walls touch the boundary?")
+
 
 class TestMissingGeometryLayers:
     """missing_geometry_layers: returns layers that have objects but all lack geometry."""
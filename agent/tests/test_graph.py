@@ -3,6 +3,7 @@ import json
 import pytest
 from unittest.mock import MagicMock, patch
 
+from app.models import SessionSummary
 from app.smalltalk import SMALLTALK_RESPONSE
 
 
@@ -275,3 +276,163 @@ class TestGraphLcNodes:
         assert out["guard_result"].get("type") == "missing_geometry"
         assert "Highway" in out["guard_result"].get("missing_layers", [])
         assert "Plot Boundary" in out["guard_result"].get("missing_layers", [])
+
+    def test_finalize_node_smalltalk_skips_session_summary(self):
+        try:
+            from app.graph_lc.nodes import finalize_node
+        except ImportError as e:
+            pytest.skip(f"LangGraph not installed: {e}")
+
+        reasoning_service = MagicMock()
+        state = {
+            "question": "hi",
+            "session_objects": [{"layer": "Highway", "geometry": None}],
+            "guard_result": {"type": "smalltalk"},
+            "_reasoning_service": reasoning_service,
+        }
+        out = finalize_node(state)
+        assert out["answer_text"] == SMALLTALK_RESPONSE
+        assert out["session_summary"] == SessionSummary().model_dump()
+        reasoning_service.compute_session_summary_dict.assert_not_called()
+
+    def test_summarize_node_stashes_rendered_summary(self):
+        try:
+            from app.graph_lc.nodes import summarize_node
+        except ImportError as e:
+            pytest.skip(f"LangGraph not installed: {e}")
+        from app.reasoning import ReasoningService
+        from app.rag.prompts import render_session_summary
+
+        state = {
+            "question": "Does this property front a highway?",
+            "session_objects": [{"layer": "Highway", "type": "line"}],
+            "_reasoning_service": ReasoningService(),
+        }
+        out = summarize_node(state)
+        assert out["session_summary"]["layer_counts"] == {"Highway": 1}
+        assert out["session_summary_rendered"] == render_session_summary(out["session_summary"])
+        assert out["session_summary_rendered"]["layer_counts"] == "Highway=1"
+
+
+class TestRunAnswer:
+    """run_answer builds AnswerResponse from graph state without re-validation."""
+
+    def test_constructed_response_round_trips(self):
+        from app.models import AnswerResponse, AnswerRequest, SessionSummary
+        from app.rag.orchestrator import run_answer
+
+        summary = SessionSummary(
+            layer_counts={"Highway": 1},
+            highways_present=True,
+            total_objects=1,
+            limitations=["Plot boundary missing"],
+        ).model_dump()
+        graph = MagicMock()
+        graph.invoke.return_value = {
+            "answer_text": "Yes.",
+            "query_mode": "hybrid",
+            "session_summary": summary,
+        }
+        response = run_answer(AnswerRequest(question="Does it front a highway?"), graph)
+
+        dumped = response.model_dump()
+        assert dumped["answer"] == "Yes."
+        assert dumped["query_mode"] == "hybrid"
+        assert dumped["evidence"] == {"document_chunks": [], "session_objects": None}
+        assert isinstance(response.session_summary, SessionSummary)
+        assert dumped["session_summary"] == summary
+        assert AnswerResponse.model_validate(dumped) == response
+
+
+class TestChunkFrame:
+    """Prebuilt NDJSON chunk, done and error frames are single JSON lines of bytes."""
+
+    @pytest.mark.parametrize("text", ["Hello", "", 'quote " and \\ slash', "line\nbreak\t", "café – ✓"])
+    def test_chunk_frame_is_one_json_line(self, text):
+        from app.rag.orchestrator import _chunk_frame
+
+        frame = _chunk_frame(text)
+        assert isinstance(frame, bytes)
+        assert frame.endswith(b"\n") and frame.count(b"\n") == 1
+        assert json.loads(frame) == {"t": "chunk", "c": text}
+
+    def test_done_frame_is_one_json_line(self):
+        from app.rag.orchestrator import _done_frame
+
+        state = {
+            "answer_text": "Yes, it fronts the \"Main Road\".",
+            "query_mode": "hybrid",
+            "session_summary": {"layer_counts": {"Highway": 1}, "limitations": []},
+        }
+        frame = _done_frame(state)
+        assert frame.endswith(b"\n") and frame.count(b"\n") == 1
+        assert json.loads(frame) == {
+            "t": "done",
+            "answer": state["answer_text"],
+            "query_mode": "hybrid",
+            "session_summary": state["session_summary"],
+        }
+        assert json.loads(_done_frame({})) == {
+            "t": "done", "answer": "", "query_mode": None, "session_summary": None,
+        }
+
+    def test_error_frame_is_one_json_line(self):
+        from app.rag.orchestrator import _error_frame
+
+        message = 'Chains not built; "call" build_chains()'
+        assert json.loads(_error_frame(message)) == {"t": "error", "message": message}
+
+
+class TestStreamDocOnlyEmpty:
+    """doc_only with nothing retrieved streams the empty message as a single done frame."""
+
+    def test_single_done_frame(self):
+        import asyncio
+
+        try:
+            from app.rag.chains import DOC_ONLY_EMPTY_MESSAGE
+            from app.rag.orchestrator import stream_answer_ndjson
+        except ImportError as e:
+            pytest.skip(f"LangChain not installed: {e}")
+        from app.models import AnswerRequest
+
+        state = {
+            "question": "What is a highway?",
+            "doc_only": True,
+            "query_mode": "doc_only",
+            "retrieved_docs": [],
+            "session_summary": {"layer_counts": {}},
+        }
+
+        async def collect():
+            return [line async for line in stream_answer_ndjson(AnswerRequest(question="What is a highway?"), None, None)]
+
+        with patch("app.graph_lc.run_graph_until_route", return_value=state):
+            lines = asyncio.run(collect())
+
+        assert len(lines) == 1
+        done = json.loads(lines[0])
+        assert done["t"] == "done"
+        assert done["answer"] == DOC_ONLY_EMPTY_MESSAGE
+        assert done["query_mode"] == "doc_only"
+
+
+class TestBuildChains:
+    """build_chains configures ChatOpenAI from settings."""
+
+    def _build(self, **kwargs):
+        try:
+            from app.rag import chains
+        except ImportError as e:
+            pytest.skip(f"LangChain not installed: {e}")
+        with patch.object(chains, "ChatOpenAI") as chat_openai:
+            chains.build_chains(api_key="k", **kwargs)
+        return chat_openai.call_args.kwargs
+
+    def test_prompt_cache_key_sent_in_request_body(self):
+        kwargs = self._build(prompt_cache_key="rag-system-v1")
+        assert kwargs["extra_body"] == {"prompt_cache_key": "rag-system-v1"}
+        assert "prompt_cache_key" not in (kwargs.get("model_kwargs") or {})
+
+    def test_no_prompt_cache_key_sends_nothing(self):
+        assert self._build()["extra_body"] is None
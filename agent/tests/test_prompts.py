@@ -5,6 +5,12 @@ from app.rag.prompts import (
     format_retrieved_chunks,
     build_user_prompt,
     build_user_prompt_doc_only,
+    render_session_summary,
+    format_json_objects,
+    render_hybrid_prompt,
+    render_doc_only_prompt,
+    HYBRID_HUMAN_TEMPLATE,
+    DOC_ONLY_HUMAN_TEMPLATE,
 )
 
 
@@ -132,3 +138,150 @@ class TestPromptCompositionDocOnlyVsHybrid:
         assert "layer_counts" in prompt or "Layer counts" in prompt
         assert "Highway=1" in prompt
         assert "Highway means..." in prompt
+
+
+class TestRenderSessionSummary:
+    """Session summary fields shared by build_user_prompt and the hybrid chain."""
+
+    def test_renders_counts_limitations_and_spatial_analysis(self):
+        rendered = render_session_summary({
+            "layer_counts": {"Highway": 1, "Walls": 2},
+            "plot_boundary_present": True,
+            "highways_present": True,
+            "limitations": ["No measurement data found in objects"],
+            "spatial_analysis": {
+                "property_highway_analysis": {"analysis": "Property fronts highway (distance: 0.00 units)"},
+                "available_geometry": ["Highway", "Plot Boundary"],
+                "missing_for_extensions": [],
+            },
+        })
+        assert rendered["layer_counts"] == "Highway=1, Walls=2"
+        assert rendered["plot_boundary_present"] == "True"
+        assert rendered["limitations"] == "No measurement data found in objects"
+        assert rendered["spatial_analysis"] == (
+            "Property-Highway: Property fronts highway (distance: 0.00 units); "
+            "Layers with geometry: Highway, Plot Boundary"
+        )
+
+    def test_empty_summary_renders_none(self):
+        rendered = render_session_summary({})
+        assert rendered["layer_counts"] == "None"
+        assert rendered["limitations"] == "None"
+        assert rendered["spatial_analysis"] == "None"
+        assert rendered["highways_present"] == "False"
+
+    def test_mutating_result_does_not_change_cached_render(self):
+        summary = {"layer_counts": {"Walls": 1}, "limitations": []}
+        rendered = render_session_summary(summary)
+        rendered["layer_counts"] = "mutated"
+        rendered["extra"] = "x"
+        assert render_session_summary(summary) == {
+            "layer_counts": "Walls=1",
+            "plot_boundary_present": "False",
+            "highways_present": "False",
+            "limitations": "None",
+            "spatial_analysis": "None",
+        }
+
+
+class TestPrecompiledTemplates:
+    """Precompiled human templates render exactly like str.format."""
+
+    def test_hybrid_matches_str_format(self):
+        values = {
+            "question": "Q {with braces}",
+            "json_objects_pretty": "[]",
+            "layer_counts": "None",
+            "plot_boundary_present": "False",
+            "highways_present": "True",
+            "limitations": "None",
+            "spatial_analysis": "None",
+            "retrieved_chunks_formatted": "No relevant excerpts found.",
+        }
+        assert render_hybrid_prompt(values) == HYBRID_HUMAN_TEMPLATE.format(**values)
+
+    def test_doc_only_matches_str_format(self):
+        values = {"question": "What is a highway?", "retrieved_chunks_formatted": "A highway is..."}
+        assert render_doc_only_prompt(values) == DOC_ONLY_HUMAN_TEMPLATE.format(**values)
+
+    @pytest.mark.parametrize("template", [
+        "a {{literal}} b {x} c",
+        "{x:>5}|{y!r}",
+        "}}{{{x!s:^7}{{{y}}}",
+        "no fields at all",
+    ])
+    def test_escapes_specs_and_conversions_match_str_format(self, template):
+        from app.rag.prompts import _compile_template, _render_compiled
+
+        values = {"x": "X", "y": 1.5}
+        assert _render_compiled(_compile_template(template), values) == template.format(**values)
+
+    def test_positional_attribute_and_nested_fields_rejected(self):
+        from app.rag.prompts import _compile_template
+
+        for template in ("{}", "{0}", "{x.y}", "{x[0]}", "{x:{w}}"):
+            with pytest.raises(ValueError):
+                _compile_template(template)
+
+
+class TestFormatChunkCache:
+    """Chunk formatting is memoized on all of its inputs."""
+
+    def test_repeat_chunk_hits_cache_and_new_text_misses(self):
+        from app.rag.prompts import _format_chunk_cached
+
+        _format_chunk_cached.cache_clear()
+        first = format_chunk("c1", "doc.pdf", "3", None, "Old text")
+        again = format_chunk(chunk_id="c1", source="doc.pdf", page="3", section=None, text="Old text")
+        changed = format_chunk("c1", "doc.pdf", "3", None, "New text")
+
+        assert again == first
+        assert changed.endswith("New text")
+        info = _format_chunk_cached.cache_info()
+        assert info.hits == 1
+        assert info.misses == 2
+
+    def test_build_user_prompt_renders_chain_templates(self):
+        """build_user_prompt(_doc_only) render the same templates the LCEL chains use."""
+        chunks = [{"id": "c1", "source": "doc.pdf", "page": "5", "section": None, "text": "Rule text"}]
+        summary = {"layer_counts": {"Walls": 1}, "limitations": []}
+
+        prompt = build_user_prompt("Q?", [{"layer": "Walls"}], summary, chunks)
+        assert prompt == HYBRID_HUMAN_TEMPLATE.format(
+            question="Q?",
+            json_objects_pretty=format_json_objects([{"layer": "Walls"}]),
+            retrieved_chunks_formatted=format_retrieved_chunks(chunks),
+            **render_session_summary(summary),
+        )
+        assert build_user_prompt_doc_only("Q?", chunks) == DOC_ONLY_HUMAN_TEMPLATE.format(
+            question="Q?", retrieved_chunks_formatted=format_retrieved_chunks(chunks),
+        )
+
+    def test_same_retrieval_result_formatted_once(self):
+        from app.rag.prompts import format_chunk_rows
+
+        chunks = [
+            {"id": "c1", "source": "doc.pdf", "page": "1", "section": None, "text": "One"},
+            {"id": "c2", "source": "doc.pdf", "page": "2", "section": "B", "text": "Two"},
+        ]
+        format_chunk_rows.cache_clear()
+        first = format_retrieved_chunks(chunks)
+        again = format_retrieved_chunks([dict(c) for c in chunks])
+
+        assert again == first
+        assert first == format_chunk("c1", "doc.pdf", "1", None, "One") + "\n\n" + format_chunk("c2", "doc.pdf", "2", "B", "Two")
+        assert format_chunk_rows.cache_info().hits == 1
+
+    def test_preformatted_chunks_are_used_as_given(self):
+        from app.rag.prompts import format_chunk_rows
+
+        chunks = [{"id": "c1", "source": "doc.pdf", "page": "1", "section": None, "text": "One"}]
+        formatted = format_retrieved_chunks(chunks)
+        format_chunk_rows.cache_clear()
+
+        hybrid = build_user_prompt("Q?", [], {}, chunks, retrieved_chunks_formatted=formatted)
+        doc_only = build_user_prompt_doc_only("Q?", chunks, retrieved_chunks_formatted=formatted)
+
+        assert hybrid == build_user_prompt("Q?", [], {}, chunks)
+        assert doc_only == build_user_prompt_doc_only("Q?", chunks)
+        assert format_chunk_rows.cache_info().misses == 1
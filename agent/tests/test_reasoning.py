@@ -37,6 +37,18 @@ class TestReasoningService:
         assert summary.layer_counts["Walls"] == 1
         assert summary.plot_boundary_present is True
         assert summary.highways_present is True
+
+    def test_compute_session_summary_dict_matches_model(self):
+        """The plain-dict summary carried by the graph has the same fields as SessionSummary."""
+        objects = [
+            {"layer": "Highway", "type": "line"},
+            {"layer": "Plot Boundary", "type": "polygon"},
+        ]
+
+        summary_dict = self.service.compute_session_summary_dict(objects)
+
+        assert summary_dict == self.service.compute_session_summary(objects).model_dump()
+        assert self.service.compute_session_summary_dict([]) == self.service.compute_session_summary([]).model_dump()
     
     def test_validate_json_schema_valid(self):
         """Test JSON validation with valid objects."""
@@ -85,3 +97,20 @@ class TestReasoningService:
         ]
         summary = self.service.compute_session_summary(objects)
         assert "No coordinate/geometry data found" not in summary.limitations
+
+
+class TestSpatialAnalysis:
+    """Fronting distance from plot boundary to highway (vertices and segments)."""
+
+    def test_distance_uses_closest_point_on_highway_segment(self):
+        from app.spatial_analysis import analyze_property_highway_relationship
+
+        plot = {"geometry": {"type": "Polygon", "coordinates": [[[4, 3], [6, 3], [6, 8], [4, 8], [4, 3]]]}}
+        highway = {"geometry": {"type": "LineString", "coordinates": [[0, 0], [10, 0]]}}
+
+        result = analyze_property_highway_relationship(plot, highway)
+
+        # Nearest highway vertex is 5 away; the segment passes 3 below the plot edge.
+        assert result["distance_to_highway"] == 3.0
+        assert result["fronts_highway"] is False
+        assert result["analysis"] == "Property is 3.00 units from highway (does not front)"
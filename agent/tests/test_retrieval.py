@@ -1,5 +1,7 @@
 """Unit tests for retrieval postprocessing (dedupe + optional distance threshold)."""
 import pytest
+from unittest.mock import MagicMock, patch
+
 from app.rag.retrieval_postprocess import postprocess
 
 
@@ -71,3 +73,63 @@ class TestPostprocessRetrievedChunks:
         assert len(result) == 2
         assert result[0]["id"] == "c2"  # lower distance first
         assert result[1]["id"] == "c1"
+
+    def test_page_cap_keeps_earliest_on_distance_ties(self):
+        """With equal distances, the chunks retrieved first win the per-page slots."""
+        chunks = [
+            _chunk("c1", "doc.pdf", "1", 0.4),
+            _chunk("c2", "doc.pdf", "1", 0.4),
+            _chunk("c3", "doc.pdf", "1", 0.4),
+            _chunk("c4", "doc.pdf", "1", None),
+            _chunk("c5", "other.pdf", "1", 0.1),
+        ]
+        result = postprocess(chunks, max_distance=None)
+        assert [c["id"] for c in result] == ["c5", "c1", "c2"]
+
+
+def _retrieval_available():
+    try:
+        import app.rag.retrieval  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+@pytest.mark.skipif(not _retrieval_available(), reason="langchain_chroma not installed")
+class TestTwoStageRetrieval:
+    """retrieve_many fetches max(top_k, coarse_k) candidates, postprocesses, then keeps top_k."""
+
+    def _vectorstore(self, rows):
+        collection = MagicMock()
+        collection.query.return_value = {
+            "ids": [[r[0] for r in rows]],
+            "documents": [["x"] * len(rows)],
+            "metadatas": [[{"source": r[1], "page": r[2]} for r in rows]],
+            "distances": [[r[3] for r in rows]],
+        }
+        return MagicMock(_collection=collection)
+
+    def test_coarse_fetch_then_trim_to_top_k(self):
+        from app.rag import retrieval
+
+        # Three near-duplicates on page 1 lose one to the per-page cap; page 2/3 fill the gap.
+        rows = [
+            ("a", "doc.pdf", "1", 0.1), ("b", "doc.pdf", "1", 0.2), ("c", "doc.pdf", "1", 0.3),
+            ("d", "doc.pdf", "2", 0.4), ("e", "doc.pdf", "3", 0.5), ("f", "doc.pdf", "4", 0.6),
+        ]
+        vs = self._vectorstore(rows)
+        with patch.object(retrieval, "get_vectorstore", return_value=vs):
+            out = retrieval.retrieve_many(["q"], top_k=3, coarse_k=6)
+
+        assert vs._collection.query.call_args.kwargs["n_results"] == 6
+        assert [c["id"] for c in out[0]] == ["a", "b", "d"]
+
+    def test_coarse_k_below_top_k_fetches_top_k(self):
+        from app.rag import retrieval
+
+        vs = self._vectorstore([("a", "doc.pdf", "1", 0.1)])
+        with patch.object(retrieval, "get_vectorstore", return_value=vs):
+            retrieval.retrieve_many(["q"], top_k=5, coarse_k=2)
+            retrieval.retrieve_many(["q"], top_k=5)
+
+        assert [c.kwargs["n_results"] for c in vs._collection.query.call_args_list] == [5, 5]
@@ -97,3 +97,14 @@ class TestGetQueryMode:
 
     def test_json_only_list_objects(self):
         assert get_query_mode("List the objects in the drawing") == "json_only"
+
+    def test_repeat_question_served_from_cache(self):
+        """Same question up to case/whitespace is classified once."""
+        from app.routing import _query_mode_normalized
+
+        _query_mode_normalized.cache_clear()
+        assert get_query_mode("How many layers?") == "json_only"
+        assert get_query_mode("  how many LAYERS? ") == "json_only"
+        info = _query_mode_normalized.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
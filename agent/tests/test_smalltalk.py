@@ -4,6 +4,7 @@ Verify that greetings/pleasantries get a short response with no RAG and no evide
 import pytest
 from unittest.mock import MagicMock, patch
 
+from app.models import SessionSummary
 from app.smalltalk import is_smalltalk, SMALLTALK_RESPONSE, get_smalltalk_response, THANKS_RESPONSE
 
 # Optional: run endpoint tests only when app can be loaded (full deps available)
@@ -47,6 +48,11 @@ class TestSmalltalkDetector:
         assert is_smalltalk("thank you") is True
         assert is_smalltalk("how are you") is True
 
+    def test_non_string_input_not_smalltalk(self):
+        """Non-str input is rejected before the per-message cache is consulted."""
+        assert is_smalltalk(None) is False
+        assert is_smalltalk(["hi"]) is False
+
 
 class TestGetSmalltalkResponse:
     """Test get_smalltalk_response returns appropriate response per message type."""
@@ -95,6 +101,16 @@ class TestAnswerEndpointSmalltalk:
         assert "answer" in data
         assert data["answer"].strip() == SMALLTALK_RESPONSE.strip()
 
+    def test_hi_returns_empty_session_summary(self, client):
+        response = client.post(
+            "/answer",
+            json={"question": "hi", "session_objects": [{"layer": "Highway", "geometry": None}]},
+        )
+        if response.status_code == 503:
+            pytest.skip("App returned 503 (services not ready in this environment)")
+        assert response.status_code == 200
+        assert response.json()["session_summary"] == SessionSummary().model_dump()
+
     def test_hi_retrieval_not_called(self, client):
         with patch("app.rag.retrieval.retrieve", MagicMock()) as mock_retrieve:
             client.post("/answer", json={"question": "hi", "session_objects": []})